@@ -0,0 +1,86 @@
+"""
+Comparativa d'eficiència de mostres: Q-Learning vs Dyna-Q amb prioritized sweeping.
+
+L'agent A (QLearningAgent o DynaQAgent) s'entrena contra un QLearningAgent amb
+els hiperparàmetres de main.py. A cada checkpoint s'avalua la política greedy
+de l'agent A contra un oponent aleatori i es mostren els episodis reals
+necessaris per arribar al winrate objectiu, i el temps total.
+
+Ús (des de l'arrel del repositori):
+    python -m benchmarks.dyna
+"""
+
+import random
+import time
+from typing import List, Optional
+
+from src.agent import QLearningAgent
+from src.battle import Battle
+from src.dyna import DynaQAgent
+from src.training import build_team, train, evaluate, random_opponent
+
+CHECKPOINT = 50
+EPISODES = 600
+EVAL_EPISODES = 200
+SEEDS = (0, 1, 2)
+TARGET_WINRATE = 0.95
+PLANNING_STEPS = (0, 5, 20)
+
+TEAM_A = ("offensive", "hybrid", "tank")
+TEAM_B = ("tank", "offensive", "hybrid")
+
+
+def learning_curve(planning_steps: int, seed: int) -> List[float]:
+    # Winrate greedy de l'agent A a cada checkpoint (planning_steps = 0: Q-Learning normal).
+    random.seed(seed)
+    if planning_steps > 0:
+        agent_a = DynaQAgent(build_team(TEAM_A, "A"), planning_steps=planning_steps)
+    else:
+        agent_a = QLearningAgent(build_team(TEAM_A, "A"))
+    agent_b = QLearningAgent(build_team(TEAM_B, "B"))
+    for agent in (agent_a, agent_b):
+        agent.setalpha(0.1)
+        agent.setgamma(0.95)
+        agent.setepsilon(0.05)
+
+    # L'avaluació la fa un QLearningAgent que comparteix la Q-table, perquè
+    # els episodis d'avaluació no alimentin el model de Dyna-Q
+    evaluator = QLearningAgent(build_team(TEAM_A, "E"))
+    evaluator.share_q_table(agent_a)
+
+    battle = Battle(agent_a, agent_b, initiative_mode="probabilistic")
+    opponent = random_opponent(TEAM_B)
+    curve = []
+    for _ in range(EPISODES // CHECKPOINT):
+        train(battle, CHECKPOINT)
+        curve.append(evaluate(evaluator, opponent, EVAL_EPISODES))
+    return curve
+
+
+def episodes_to_target(curve: List[float]) -> Optional[int]:
+    # Primer checkpoint on s'arriba a TARGET_WINRATE (None si no s'hi arriba).
+    for i, winrate in enumerate(curve):
+        if winrate >= TARGET_WINRATE:
+            return (i + 1) * CHECKPOINT
+    return None
+
+
+def main():
+    print("=" * 60)
+    print("Q-LEARNING VS DYNA-Q (PRIORITIZED SWEEPING)")
+    print("=" * 60)
+    for planning_steps in PLANNING_STEPS:
+        start = time.perf_counter()
+        curves = [learning_curve(planning_steps, seed) for seed in SEEDS]
+        elapsed = time.perf_counter() - start
+        mean = [sum(c[i] for c in curves) / len(curves) for i in range(len(curves[0]))]
+        target = episodes_to_target(mean)
+        label = f"Dyna-Q (n={planning_steps})" if planning_steps > 0 else "Q-Learning"
+        points = " ".join(f"{100 * w:4.0f}" for w in mean)
+        print(f"\n{label}: {points}")
+        print(f"  Episodis fins a {100 * TARGET_WINRATE:.0f}%: "
+              f"{target if target is not None else f'> {EPISODES}'} | temps: {elapsed:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
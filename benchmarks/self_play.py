@@ -0,0 +1,81 @@
+"""
+Comparativa de velocitat d'aprenentatge: dues Q-tables vs Q-table compartida.
+
+Per a cada configuració d'equips (mirall i diferents) entrena dos agents amb
+els hiperparàmetres de main.py, amb Q-tables separades o compartides
+(QLearningAgent.share_q_table). A cada checkpoint avalua la política greedy de
+l'agent A contra un oponent aleatori i mostra els episodis necessaris per
+arribar al winrate objectiu.
+
+Ús (des de l'arrel del repositori):
+    python -m benchmarks.self_play
+"""
+
+import random
+from typing import List, Optional, Sequence
+
+from src.agent import QLearningAgent
+from src.battle import Battle
+from src.training import build_team, train, evaluate, random_opponent
+
+CHECKPOINT = 100
+EPISODES = 2000
+EVAL_EPISODES = 200
+SEEDS = (0, 1, 2)
+TARGET_WINRATE = 0.95
+
+MATCHUPS = {
+    "mirall": (("offensive", "hybrid", "tank"), ("offensive", "hybrid", "tank")),
+    "diferents": (("offensive", "hybrid", "tank"), ("tank", "offensive", "hybrid")),
+}
+
+
+def learning_curve(team_a: Sequence[str], team_b: Sequence[str], shared: bool,
+                   seed: int) -> List[float]:
+    # Winrate greedy de l'agent A a cada checkpoint.
+    random.seed(seed)
+    agent_a = QLearningAgent(build_team(team_a, "A"))
+    agent_b = QLearningAgent(build_team(team_b, "B"))
+    for agent in (agent_a, agent_b):
+        agent.setalpha(0.1)
+        agent.setgamma(0.95)
+        agent.setepsilon(0.05)
+    if shared:
+        agent_b.share_q_table(agent_a)
+
+    battle = Battle(agent_a, agent_b, initiative_mode="probabilistic")
+    opponent = random_opponent(team_b)
+    curve = []
+    for _ in range(EPISODES // CHECKPOINT):
+        train(battle, CHECKPOINT)
+        curve.append(evaluate(agent_a, opponent, EVAL_EPISODES))
+    return curve
+
+
+def episodes_to_target(curve: List[float]) -> Optional[int]:
+    # Primer checkpoint on s'arriba a TARGET_WINRATE (None si no s'hi arriba).
+    for i, winrate in enumerate(curve):
+        if winrate >= TARGET_WINRATE:
+            return (i + 1) * CHECKPOINT
+    return None
+
+
+def main():
+    print("=" * 60)
+    print("SELF-PLAY: Q-TABLES SEPARADES VS COMPARTIDA")
+    print("=" * 60)
+    for name, (team_a, team_b) in MATCHUPS.items():
+        print(f"\nEquips {name}: A={list(team_a)} | B={list(team_b)}")
+        for shared in (False, True):
+            curves = [learning_curve(team_a, team_b, shared, seed) for seed in SEEDS]
+            mean = [sum(c[i] for c in curves) / len(curves) for i in range(len(curves[0]))]
+            target = episodes_to_target(mean)
+            label = "compartida" if shared else "separades "
+            points = " ".join(f"{100 * w:4.0f}" for w in mean)
+            print(f"  {label}: {points}")
+            print(f"    Episodis fins a {100 * TARGET_WINRATE:.0f}%: "
+                  f"{target if target is not None else f'> {EPISODES}'}")
+
+
+if __name__ == "__main__":
+    main()
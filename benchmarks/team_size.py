@@ -0,0 +1,64 @@
+"""
+Benchmark del cost per torn segons la mida de l'equip (1v1 ... 24v24).
+
+Executa episodis d'entrenament complets (Battle.step amb elecció d'acció,
+resolució, log i actualització Q) i mesura el temps mitjà per torn.
+Amb la màscara de vius, el cost per torn s'ha de mantenir pràcticament pla.
+
+Ús (des de l'arrel del repositori):
+    python -m benchmarks.team_size
+"""
+
+import random
+import time
+
+from src.agent import QLearningAgent
+from src.battle import Battle
+from src.training import build_team
+
+TYPES = ("offensive", "hybrid", "tank")
+TEAM_SIZES = (1, 3, 6, 12, 24)
+TURNS = 50000
+
+
+def make_team(size: int, suffix: str):
+    # Equip de mida arbitrària repetint els tipus en ordre.
+    return build_team([TYPES[i % len(TYPES)] for i in range(size)], suffix)
+
+
+def bench(size: int, turns: int = TURNS) -> float:
+    """
+    Returns:
+        Microsegons per torn.
+    """
+    random.seed(size)
+    agent_a = QLearningAgent(make_team(size, "A"))
+    agent_b = QLearningAgent(make_team(size, "B"))
+    battle = Battle(agent_a, agent_b, initiative_mode="probabilistic")
+
+    done = 0
+    start = time.perf_counter()
+    while done < turns:
+        battle.reset_episode()
+        while done < turns:
+            done += 1
+            if not battle.step():
+                break
+    return (time.perf_counter() - start) / turns * 1e6
+
+
+def main():
+    print("=" * 60)
+    print("COST PER TORN SEGONS LA MIDA DE L'EQUIP")
+    print("=" * 60)
+    for size in TEAM_SIZES:
+        agent = QLearningAgent(make_team(size, "X"))
+        dims = agent.state_dims(QLearningAgent(make_team(size, "Y")))
+        space = 1
+        for d in dims:
+            space *= d
+        print(f"  {size:>2}v{size:<2}: {bench(size):7.2f} us/torn | espai d'estats: {space}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ Accions: attack, defend, super_attack, switch.
 from src.character import TankCharacter, HybridCharacter, OffensiveCharacter
 from src.agent import QLearningAgent
 from src.battle import Battle
+from src.training import run_episode
 
 
 def create_team_a():
@@ -50,6 +51,18 @@ def main():
     agent_a.setepsilon(0.05)
     agent_b.setepsilon(0.05)
 
+    # Self-play simètric: tots dos agents comparteixen una única Q-table
+    SELF_PLAY = False
+    if SELF_PLAY:
+        agent_b.share_q_table(agent_a)
+
+    # Telemetria de les Q-tables (snapshot cada 10000 actualitzacions).
+    # tracemalloc alenteix molt l'entrenament: activar-lo només per diagnosticar memòria.
+    TRACK_ALLOCATIONS = False
+    telemetry_a = agent_a.enable_telemetry(agent_b, interval=10000,
+                                           track_allocations=TRACK_ALLOCATIONS)
+    telemetry_b = agent_b.enable_telemetry(agent_a, interval=10000)
+
     # Crear batalla
     battle = Battle(agent_a, agent_b, initiative_mode="probabilistic")
 
@@ -69,22 +82,17 @@ def main():
     print(f"\nEquip A: {[c.char_type for c in team_a]}")
     print(f"Equip B: {[c.char_type for c in team_b]}")
     print(f"\nEpisodis: {EPISODES}")
+    print(f"Self-play (Q-table compartida): {SELF_PLAY}")
     print(f"Mode iniciativa: {battle._initiative_mode}")
     print("=" * 60)
 
 
 
     for episode in range(EPISODES):
-        battle.reset_episode()
-        
-        # Executar episodi fins que acabi
-        max_turns = 100  # Límit de torns per evitar bucles infinits
-        turn = 0
-        while battle.step() and turn < max_turns:
-            turn += 1
+        # Executar episodi fins que acabi (límit de torns per evitar bucles infinits)
+        winner = run_episode(battle, max_turns=100)
 
         # Comptabilitzar resultat
-        winner = battle.get_winner()
         if winner == "A":
             wins_a += 1
         elif winner == "B":
@@ -125,6 +133,15 @@ def main():
     print(f"\nEstats-acció apresos Agent A: {len(agent_a.q_table)}")
     print(f"Estats-acció apresos Agent B: {len(agent_b.q_table)}")
 
+    # Telemetria final de memòria i visitació
+    for label, telemetry in (("A", telemetry_a), ("B", telemetry_b)):
+        snap = telemetry.emit()
+        print(f"Telemetria Agent {label}: {snap.bytes_used / 1024:.1f} KB, "
+              f"{snap.visited_states} estats visitats, "
+              f"{100 * snap.unvisited_fraction:.1f}% de l'espai sense visitar")
+    agent_a.disable_telemetry()
+    agent_b.disable_telemetry()
+
     # Mostrar alguns valors Q interessants (top 10 per valor absolut)
     print("\n" + "-" * 40)
     print("TOP 10 Q-VALUES (Agent A):")
@@ -1,7 +1,7 @@
 """
-# Agent Q-Learning per a combat (singles 3v3).
+# Agent Q-Learning per a combat (singles NvN, 3v3 per defecte).
 # 
-# L'agent gestiona un equip de 3 personatges i aprèn:
+# L'agent gestiona un equip de N personatges i aprèn:
 # - Quan atacar, defensar, usar super_attack
 # - Quan canviar de personatge (acció "switch")
 # 
@@ -10,16 +10,25 @@
 # - Vida del personatge actiu enemic (0-10)
 # - Tipus del personatge actiu propi (tank=0, hybrid=1, offensive=2)
 # - Tipus del personatge actiu enemic (tank=0, hybrid=1, offensive=2)
-# - Nombre de personatges vius propis (1-3)
-# - Nombre de personatges vius enemics (1-3)
+# - Nombre de personatges vius propis (0-N)
+# - Nombre de personatges vius enemics (0-N)
+#
+# Els personatges vius es guarden com a màscara de bits (bit i = personatge i viu)
+# amb un comptador, de manera que les consultes de banqueta i de vius són O(1)
+# i la mida de l'estat només creix linealment amb la mida de l'equip.
 """
 
 import random
-from typing import List, Tuple, Optional
+from typing import Callable, List, Tuple, Optional
+
+from src.telemetry import QTableTelemetry
 
 # Mapeig de tipus de personatge a índexs numèrics per a l'estat
 TYPE_TO_INDEX = {"tank": 0, "hybrid": 1, "offensive": 2}
 
+# Totes les accions possibles (per al max futur de Q-Learning)
+ACTIONS = ("attack", "defend", "super_attack", "switch")
+
 
 def discretize(health: int, max_health: int = 100) -> int:
     """
@@ -32,20 +41,27 @@ def discretize(health: int, max_health: int = 100) -> int:
 
 class QLearningAgent:
     """
-    Agent Q-Learning que gestiona un equip de 3 personatges.
+    Agent Q-Learning que gestiona un equip de N personatges.
     Aprèn política òptima per a combat singles estil.
     """
 
     def __init__(self, team: List):
         """
         Args:
-            team: Llista de 3 objectes Character (subclasses de Character)
+            team: Llista d'objectes Character (subclasses de Character), almenys 1
         """
-        if len(team) != 3:
-            raise ValueError("L'equip ha de tenir exactament 3 personatges")
+        if len(team) < 1:
+            raise ValueError("L'equip ha de tenir almenys 1 personatge")
         
         self.team = team
-        self.active_index = 0  # Índex del personatge actiu (0, 1, o 2)
+        self.active_index = 0  # Índex del personatge actiu (0 a N-1)
+
+        # Màscara de personatges vius (bit i = team[i] viu) i comptador.
+        # Els personatges avisen l'agent quan queden KO (Character._take_damage);
+        # qualsevol modificació directa de `health` requereix cridar refresh_alive().
+        self.alive_mask = 0
+        self.alive_count = 0
+        self._bind_team()
         
         # Accions base (switch s'afegeix dinàmicament si hi ha personatges vius a la banqueta)
         self.base_actions = ["attack", "defend", "super_attack"]
@@ -57,27 +73,67 @@ class QLearningAgent:
         self.gamma = 0.9    # Factor de descompte
         self.epsilon = 0.2  # Taxa d'exploració (e-greedy)
 
+        # Telemetria de la Q-table (desactivada per defecte)
+        self.telemetry: Optional[QTableTelemetry] = None
+
+    def _bind_team(self) -> None:
+        # Registra aquest agent com a propietari dels personatges i recalcula la màscara.
+        for i, c in enumerate(self.team):
+            c.set_owner(self, i)
+        self.refresh_alive()
+
+    def __setstate__(self, state) -> None:
+        # Després de deepcopy/pickle, l'equip copiat ha d'avisar la còpia de l'agent.
+        self.__dict__.update(state)
+        self._bind_team()
+
     @property
     def character(self):
         # Retorna el personatge actiu actual (compatibilitat amb codi anterior).
         return self.team[self.active_index]
 
+    def refresh_alive(self) -> None:
+        # Recalcula la màscara de vius a partir de la vida (cal cridar-la després
+        # de modificar `health` directament, sense passar per Character._take_damage).
+        mask = 0
+        for i, c in enumerate(self.team):
+            if c.is_alive():
+                mask |= 1 << i
+        self.alive_mask = mask
+        self.alive_count = bin(mask).count("1")
+
+    def mark_fainted(self, index: int) -> None:
+        # Marca team[index] com a KO a la màscara (idempotent).
+        bit = 1 << index
+        if self.alive_mask & bit:
+            self.alive_mask ^= bit
+            self.alive_count -= 1
+
+    def _bench_indices(self) -> List[int]:
+        # Índexs dels personatges vius a la banqueta (recorrent només els bits actius).
+        mask = self.alive_mask & ~(1 << self.active_index)
+        indices = []
+        while mask:
+            low = mask & -mask
+            indices.append(low.bit_length() - 1)
+            mask ^= low
+        return indices
+
     def get_alive_team(self) -> List:
         # Retorna llista de personatges vius a l'equip.
-        return [c for c in self.team if c.is_alive()]
+        return [c for i, c in enumerate(self.team) if self.alive_mask >> i & 1]
 
     def get_bench(self) -> List[Tuple[int, any]]:
         # Retorna llista de (índex, personatge) vius que NO estan actius.
-        return [(i, c) for i, c in enumerate(self.team) 
-                if c.is_alive() and i != self.active_index]
+        return [(i, self.team[i]) for i in self._bench_indices()]
 
     def count_alive(self) -> int:
         # Compta personatges vius a l'equip.
-        return sum(1 for c in self.team if c.is_alive())
+        return self.alive_count
 
     def has_switch_available(self) -> bool:
         # Retorna True si hi ha almenys un personatge viu a la banqueta.
-        return len(self.get_bench()) > 0
+        return (self.alive_mask & ~(1 << self.active_index)) != 0
 
     def get_state(self, enemy_agent: "QLearningAgent") -> Tuple:
         """
@@ -98,6 +154,14 @@ class QLearningAgent:
             enemy_agent.count_alive()
         )
 
+    def state_dims(self, enemy_agent: "QLearningAgent") -> Tuple[int, ...]:
+        """
+        Cardinalitat de cada dimensió de get_state(enemy_agent).
+        Els comptadors de vius van de 0 a la mida de cada equip (0 en estats terminals).
+        """
+        n_types = len(TYPE_TO_INDEX)
+        return (11, 11, n_types, n_types, len(self.team) + 1, len(enemy_agent.team) + 1)
+
     def get_allowed_actions(self) -> List[str]:
         """
         Retorna les accions permeses segons l'estat actual.
@@ -147,12 +211,11 @@ class QLearningAgent:
         Returns:
             Índex del personatge al qual canviar, o None si no hi ha opcions.
         """
-        bench = self.get_bench()
+        bench = self._bench_indices()
         if not bench:
             return None
         # Selecció aleatòria (podria millorar-se amb una altra Q-table o heurística)
-        idx, _ = random.choice(bench)
-        return idx
+        return random.choice(bench)
 
     def perform_switch(self, target_index: Optional[int] = None) -> bool:
         """
@@ -173,7 +236,7 @@ class QLearningAgent:
         if target_index < 0 or target_index >= len(self.team):
             return False
         
-        if not self.team[target_index].is_alive():
+        if not self.alive_mask >> target_index & 1:
             return False
         
         self.active_index = target_index
@@ -186,13 +249,14 @@ class QLearningAgent:
         Returns:
             True si s'ha fet canvi, False si no hi havia a qui canviar (derrota).
         """
-        if self.character.is_alive():
+        mask = self.alive_mask
+        if mask >> self.active_index & 1:
             return True  # No cal canvi
         
-        for i, c in enumerate(self.team):
-            if c.is_alive():
-                self.active_index = i
-                return True
+        if mask:
+            # Primer viu disponible (bit més baix)
+            self.active_index = (mask & -mask).bit_length() - 1
+            return True
         
         return False  # Tots KO - derrota
 
@@ -208,24 +272,54 @@ class QLearningAgent:
         # Per al max futur, considerem totes les accions possibles en el següent estat
         # Nota: En estat terminal (derrota), future_q = 0
 
-        future_actions = ["attack", "defend", "super_attack", "switch"]
-
         future_q = max(
-            self.q_table.get((next_state, a), 0.0) for a in future_actions
+            self.q_table.get((next_state, a), 0.0) for a in ACTIONS
         )
 
         new_q = old_q + self.alpha * (reward + self.gamma * future_q - old_q)
         self.q_table[(state, action)] = new_q
 
+        if self.telemetry is not None:
+            self.telemetry.observe(state)
+
+    def share_q_table(self, other: "QLearningAgent") -> None:
+        """
+        Fa que aquest agent llegeixi i escrigui la Q-table de `other` (self-play simètric).
+        Com que get_state és relatiu a cada banda, les transicions de tots dos
+        seients actualitzen la mateixa política.
+        """
+        self.q_table = other.q_table
+
+    def enable_telemetry(self, enemy_agent: "QLearningAgent", interval: int = 1000,
+                         sink: Optional[Callable] = None,
+                         track_allocations: bool = False) -> QTableTelemetry:
+        """
+        Activa la telemetria de la Q-table (snapshot cada `interval` actualitzacions).
+        `enemy_agent` és l'oponent (la seva mida d'equip fixa l'espai d'estats).
+
+        Returns:
+            L'objecte QTableTelemetry (els snapshots es desen a .snapshots).
+        """
+        self.disable_telemetry()
+        self.telemetry = QTableTelemetry(self, enemy_agent, interval, sink, track_allocations)
+        return self.telemetry
+
+    def disable_telemetry(self) -> None:
+        # Desactiva la telemetria i allibera tracemalloc si l'havia iniciat.
+        if self.telemetry is not None:
+            self.telemetry.close()
+            self.telemetry = None
+
     def reset_for_episode(self) -> None:
         # Reinicia l'agent i tot el seu equip per a un nou episodi.
         self.active_index = 0
         for c in self.team:
             c.reset_for_battle()
+        self.refresh_alive()
 
     def all_fainted(self) -> bool:
         # Retorna True si tots els personatges de l'equip estan KO.
-        return all(not c.is_alive() for c in self.team)
+        return self.alive_mask == 0
 
     def setgamma(self, gamma: float) -> None:
 
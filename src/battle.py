@@ -1,31 +1,96 @@
 """
-Sistema de batalla singles (3v3).
+Sistema de batalla singles (NvN, 3v3 per defecte).
 
-Cada agent té un equip de 3 personatges.
+Cada agent té un equip de N personatges (les mides poden ser diferents).
 Només un personatge per equip està actiu a la vegada.
 Accions: attack, defend, super_attack, switch.
-Victòria: derrotar els 3 personatges de l'oponent.
+Victòria: derrotar tots els personatges de l'oponent.
 
 """
 
 import random
-from typing import Tuple, List
+from typing import Callable, Dict, Tuple, List, NamedTuple
+
+from src.kernel import (
+    TURN_TABLE, P_A_FIRST, FASTER_FIRST, INITIATIVE_MODES,
+    A_FIRST, B_FIRST, SIMULTANEOUS, initiative_forced,
+)
+
+
+class BattleState(NamedTuple):
+    """
+    Posició de la batalla (immutable i hashable) per a snapshot/restore.
+    No inclou les Q-tables ni el log d'accions.
+
+    defending_a / defending_b són màscares de bits (bit i = personatge i defensant).
+    """
+
+    active_a: int
+    health_a: Tuple[int, ...]
+    cooldown_a: Tuple[int, ...]
+    defending_a: int
+    active_b: int
+    health_b: Tuple[int, ...]
+    cooldown_b: Tuple[int, ...]
+    defending_b: int
+
+
+def _defending_mask(team: List) -> int:
+    # Empaqueta els flags de defensa d'un equip en una màscara de bits.
+    mask = 0
+    for i, c in enumerate(team):
+        if c.is_defending:
+            mask |= 1 << i
+    return mask
+
+
+def _restore_team(agent, active: int, health: Tuple[int, ...],
+                  cooldown: Tuple[int, ...], defending: int) -> None:
+    # Restaura l'estat mutable de l'equip d'un agent.
+    agent.active_index = active
+    for i, c in enumerate(agent.team):
+        c.health = health[i]
+        c.cooldown = cooldown[i]
+        c.is_defending = bool(defending >> i & 1)
+    agent.refresh_alive()
+
+
+# Esdeveniments als quals es pot subscriure un observador (Battle.subscribe).
+# Tots els callbacks reben la batalla com a primer argument:
+# - turn_start(battle, turn_index)
+# - action_chosen(battle, side, action)             side = "A" | "B"
+# - damage_dealt(battle, side, damage, target)      target = personatge que rep el dany
+# - ko(battle, side, character)                     side = banda del personatge KO
+# - turn_end(battle, reward_a, reward_b)
+# - episode_end(battle, winner)                     winner = "A" | "B" | "draw"
+#   (s'emet en acabar la batalla o, per episodis tallats per límit de torns,
+#   a end_episode() / reset_episode())
+EVENTS = ("turn_start", "action_chosen", "damage_dealt", "ko", "turn_end", "episode_end")
 
 
 class Battle:
     
     """
-    Gestiona combats singles 3v3 entre dos agents Q-Learning.
+    Gestiona combats singles NvN entre dos agents Q-Learning.
+
+    Admet observadors per esdeveniment (subscribe/unsubscribe). Sense cap
+    subscriptor, el torn només comprova un flag i no crida cap dispatch.
     """
 
+    # Reward shaping
+    KO_REWARD = 50        # Bonus per KO enemic (penalització per KO propi)
+    VICTORY_REWARD = 100  # Bonus per victòria (penalització per derrota)
+
     def __init__(self, agent_a, agent_b, initiative_mode: str = "probabilistic"):
 
         """
         Args:
-            agent_a: Primer QLearningAgent amb equip de 3
-            agent_b: Segon QLearningAgent amb equip de 3
+            agent_a: Primer QLearningAgent amb el seu equip
+            agent_b: Segon QLearningAgent amb el seu equip
             initiative_mode: "probabilistic" | "deterministic" | "alternate" | "simultaneous"
         """
+        if initiative_mode not in INITIATIVE_MODES:
+            raise ValueError(f"Mode d'iniciativa desconegut: {initiative_mode}. Usa: {list(INITIATIVE_MODES)}")
 
         self.agent_a = agent_a
         self.agent_b = agent_b
@@ -33,109 +98,110 @@ class Battle:
         self._initiative_toggle = 0
         self._initiative_mode = initiative_mode
 
-    def _choose_order(self, a, b, action_a: str, action_b: str) -> Tuple[List, bool]:
-        """
-        Determina l'ordre d'execució segons velocitat i initiative_mode.
-        
-        Returns:
-            (order_list, simultaneous_flag)
-        """
-        if self._initiative_mode == "simultaneous":
-            return [("A", a, b, action_a), ("B", b, a, action_b)], True
-
-        # Switches sempre tenen prioritat màxima
-        a_switches = action_a == "switch"
-        b_switches = action_b == "switch"
-        
-        if a_switches and not b_switches:
-            return [("A", a, b, action_a), ("B", b, a, action_b)], False
-        elif b_switches and not a_switches:
-            return [("B", b, a, action_b), ("A", a, b, action_a)], False
-        
-        # Tots dos switch o cap: usar velocitat
-        sa = a.character.get_speed()
-        sb = b.character.get_speed()
-
-        if self._initiative_mode == "probabilistic":
-            total = sa + sb
-            p_a = (sa / total) if total > 0 else 0.5
-            first = "A" if random.random() < p_a else "B"
-        
-        if first == "A":
-            return [("A", a, b, action_a), ("B", b, a, action_b)], False
+        # Callbacks per esdeveniment i flag de dispatch actiu
+        self._hooks: Dict[str, Tuple[Callable, ...]] = {}
+        self._hooks_active = False
+        self._episode_open = False  # Episodi amb torns jugats i sense episode_end emès
+
+    def subscribe(self, event: str, callback: Callable) -> None:
+        # Subscriu un callback a un esdeveniment (vegeu EVENTS).
+        if event not in EVENTS:
+            raise ValueError(f"Esdeveniment desconegut: {event}. Usa: {list(EVENTS)}")
+        self._hooks[event] = self._hooks.get(event, ()) + (callback,)
+        self._hooks_active = True
+
+    def unsubscribe(self, event: str, callback: Callable) -> None:
+        # Elimina un callback subscrit prèviament (no fa res si no hi era).
+        callbacks = tuple(cb for cb in self._hooks.get(event, ()) if cb is not callback)
+        if callbacks:
+            self._hooks[event] = callbacks
         else:
-            return [("B", b, a, action_b), ("A", a, b, action_a)], False
-
-    def _execute_action(self, attacker, defender, action: str) -> int:
-        # Executa una acció i retorna el dany infligit (0 per switch/defend).
-        if action == "switch":
-            attacker.perform_switch()
-            return 0
-        elif action == "defend":
-            # Ja s'ha activat abans
-            return 0
-        elif action == "attack":
-            return attacker.character.attack(defender.character)
-        elif action == "super_attack":
-            return attacker.character.super_attack(defender.character)
-        return 0
-
-    def step(self) -> bool:
+            self._hooks.pop(event, None)
+        self._hooks_active = bool(self._hooks)
+
+    def _emit(self, event: str, *args) -> None:
+        # Crida els callbacks d'un esdeveniment (només s'invoca si _hooks_active).
+        for callback in self._hooks.get(event, ()):
+            callback(self, *args)
+
+    def _roll_initiative(self, char_a, char_b) -> int:
+        # Tira la iniciativa segons initiative_mode (A_FIRST o B_FIRST).
+        mode = self._initiative_mode
+        if mode == "probabilistic":
+            p_a = P_A_FIRST[(char_a.char_type, char_b.char_type)]
+            return A_FIRST if random.random() < p_a else B_FIRST
+        if mode == "deterministic":
+            return FASTER_FIRST[(char_a.char_type, char_b.char_type)]
+        # alternate
+        first = A_FIRST if self._initiative_toggle == 0 else B_FIRST
+        self._initiative_toggle ^= 1
+        return first
+
+    def resolve_turn(self, action_a: str, action_b: str) -> Tuple[Dict[str, int], float, float, bool]:
         """
-        Executa un torn complet de batalla.
-        
+        Resol un torn amb accions ja triades (sense log ni actualització de Q-tables).
+        Útil per a simulacions (cerca, rollouts).
+        L'ordre, el dany i els cooldowns surten de la taula precalculada de src/kernel.py.
+
         Returns:
-            True si la batalla continua, False si ha acabat (un agent sense personatges vius).
+            (damage, reward_a, reward_b, finished)
         """
         a = self.agent_a
         b = self.agent_b
-        turn_index = len(self.actions_log) + 1
-
-        # Capturar estat abans d'actuar
-        state_a = a.get_state(b)
-        state_b = b.get_state(a)
+        char_a = a.character
+        char_b = b.character
+        hooks = self._hooks_active
 
-        # Triar accions
-        action_a = a.choose_action(b)
-        action_b = b.choose_action(a)
+        # Determinar ordre d'execució (els switch fixen l'ordre sense tirar iniciativa)
+        if self._initiative_mode == "simultaneous":
+            initiative = SIMULTANEOUS
+        elif initiative_forced(action_a, action_b):
+            initiative = A_FIRST
+        else:
+            initiative = self._roll_initiative(char_a, char_b)
+        entry = TURN_TABLE[(char_a.char_type, char_b.char_type, action_a, action_b, initiative)]
+        simultaneous = entry.simultaneous
 
         # Defenses s'activen abans de qualsevol atac
         if action_a == "defend":
-            a.character.defend()
+            char_a.defend()
         if action_b == "defend":
-            b.character.defend()
+            char_b.defend()
 
-        # Determinar ordre d'execució
-        order, simultaneous = self._choose_order(a, b, action_a, action_b)
-
-        damage = {"A": 0, "B": 0}
-        # Guardar els personatges que han triat les accions per al log
-        char_a_at_action = a.character.char_type
-        char_b_at_action = b.character.char_type
+        sides = (a, b)
+        dealt = [0, 0]
 
-        if simultaneous:
-            # Executar tots dos sense cancel·lar per KO
-            for label, attacker, defender, action in order:
-                dealt = self._execute_action(attacker, defender, action)
-                damage[label] = dealt
-        else:
-            # Executar en ordre; cancel·lar si l'objectiu mor
-            for label, attacker, defender, action in order:
+        for side, action, hit, cooldown_delta, cooldown_reset in entry.steps:
+            attacker = sides[side]
+            if action == "switch":
                 # Switch sempre es pot executar (fins i tot si el personatge actual està KO,
-                # perquè pot ser que hagi mort en aquest mateix torn i el switch ja estava triat)
-                if action == "switch":
-                    # Només executar si hi ha algú a qui canviar
-                    if attacker.has_switch_available():
-                        attacker.perform_switch()
-                    continue
-                # Si l'atacant ja està KO, no pot actuar (per a atacs)
-                if not attacker.character.is_alive():
-                    continue
-                # Si el defensor ja està KO, no ataquem (l'atac no té sentit)
-                if not defender.character.is_alive():
-                    continue
-                dealt = self._execute_action(attacker, defender, action)
-                damage[label] = dealt
+                # perquè pot ser que hagi mort en aquest mateix torn i el switch ja estava triat).
+                # perform_switch no fa res si no hi ha ningú a qui canviar.
+                attacker.perform_switch()
+                continue
+            if action == "defend":
+                # Ja s'ha activat abans
+                continue
+            defender = sides[1 - side]
+            attacker_char = attacker.character
+            defender_char = defender.character
+            # En mode seqüencial, cancel·lar si l'atacant o el defensor ja estan KO
+            if not simultaneous and (attacker_char.health <= 0 or defender_char.health <= 0):
+                continue
+            was_alive = defender_char.health > 0
+            # _take_damage marca el KO a la màscara del defensor
+            defender_char._take_damage(hit)
+            if cooldown_reset is None:
+                attacker_char.cooldown += cooldown_delta
+            else:
+                attacker_char.cooldown = cooldown_reset
+            dealt[side] = hit
+            if hooks:
+                self._emit("damage_dealt", "AB"[side], hit, defender_char)
+                if was_alive and defender_char.health <= 0:
+                    self._emit("ko", "AB"[1 - side], defender_char)
+
+        damage = {"A": dealt[0], "B": dealt[1]}
 
         # Calcular recompenses
         reward_a = damage["A"] - damage["B"]
@@ -147,11 +213,11 @@ class Battle:
 
         # Bonus/penalització per KO de personatge
         if b_char_fainted:
-            reward_a += 50  # Bonus per KO enemic
-            reward_b -= 50
+            reward_a += self.KO_REWARD  # Bonus per KO enemic
+            reward_b -= self.KO_REWARD
         if a_char_fainted:
-            reward_b += 50
-            reward_a -= 50
+            reward_b += self.KO_REWARD
+            reward_a -= self.KO_REWARD
 
         # Forçar canvi si l'actiu ha mort
         if a_char_fainted:
@@ -164,11 +230,49 @@ class Battle:
         b_all_fainted = b.all_fainted()
 
         if b_all_fainted and not a_all_fainted:
-            reward_a += 100  # Victòria
-            reward_b -= 100
+            reward_a += self.VICTORY_REWARD  # Victòria
+            reward_b -= self.VICTORY_REWARD
         elif a_all_fainted and not b_all_fainted:
-            reward_b += 100
-            reward_a -= 100
+            reward_b += self.VICTORY_REWARD
+            reward_a -= self.VICTORY_REWARD
+
+        # Reset estat de torn (defensa)
+        a.character.reset_turn()
+        b.character.reset_turn()
+
+        return damage, reward_a, reward_b, a_all_fainted or b_all_fainted
+
+    def step(self) -> bool:
+        """
+        Executa un torn complet de batalla.
+        
+        Returns:
+            True si la batalla continua, False si ha acabat (un agent sense personatges vius).
+        """
+        a = self.agent_a
+        b = self.agent_b
+        turn_index = len(self.actions_log) + 1
+        hooks = self._hooks_active
+        self._episode_open = True
+        if hooks:
+            self._emit("turn_start", turn_index)
+
+        # Capturar estat abans d'actuar
+        state_a = a.get_state(b)
+        state_b = b.get_state(a)
+
+        # Triar accions
+        action_a = a.choose_action(b)
+        action_b = b.choose_action(a)
+        if hooks:
+            self._emit("action_chosen", "A", action_a)
+            self._emit("action_chosen", "B", action_b)
+
+        # Guardar els personatges que han triat les accions per al log
+        char_a_at_action = a.character.char_type
+        char_b_at_action = b.character.char_type
+
+        damage, reward_a, reward_b, finished = self.resolve_turn(action_a, action_b)
 
         # Log del torn (usant els personatges que han triat les accions)
         # També mostrem el personatge actual si ha canviat (per switch o force_switch)
@@ -202,15 +306,50 @@ class Battle:
         a.update_q(state_a, action_a, reward_a, next_state_a)
         b.update_q(state_b, action_b, reward_b, next_state_b)
 
-        # Reset estat de torn (defensa)
-        a.character.reset_turn()
-        b.character.reset_turn()
+        if hooks:
+            self._emit("turn_end", reward_a, reward_b)
+        if finished:
+            self.end_episode()
 
         # Retorna False si la batalla ha acabat
-        return not (a_all_fainted or b_all_fainted)
+        return not finished
+
+    def snapshot(self) -> BattleState:
+        # Captura la posició actual de tots dos equips (sense tocar les Q-tables).
+        team_a = self.agent_a.team
+        team_b = self.agent_b.team
+        return BattleState(
+            self.agent_a.active_index,
+            tuple([c.health for c in team_a]),
+            tuple([c.cooldown for c in team_a]),
+            _defending_mask(team_a),
+            self.agent_b.active_index,
+            tuple([c.health for c in team_b]),
+            tuple([c.cooldown for c in team_b]),
+            _defending_mask(team_b),
+        )
+
+    def restore(self, state: BattleState) -> None:
+        # Restaura una posició capturada amb snapshot() (el log d'accions no es modifica).
+        _restore_team(self.agent_a, state.active_a, state.health_a,
+                      state.cooldown_a, state.defending_a)
+        _restore_team(self.agent_b, state.active_b, state.health_b,
+                      state.cooldown_b, state.defending_b)
+
+    def end_episode(self) -> None:
+        """
+        Tanca l'episodi actual i emet episode_end si encara no s'havia emès.
+        Els bucles d'episodis l'han de cridar quan tallen un episodi per límit de torns.
+        """
+        if not self._episode_open:
+            return
+        self._episode_open = False
+        if self._hooks_active:
+            self._emit("episode_end", self.get_winner())
 
     def reset_episode(self) -> None:
-        # Reinicia la batalla per a un nou episodi.
+        # Reinicia la batalla per a un nou episodi (tancant l'anterior si havia quedat obert).
+        self.end_episode()
         self.actions_log = []
         self.agent_a.reset_for_episode()
         self.agent_b.reset_for_episode()
@@ -10,7 +10,9 @@
 # El canvi de personatge es gestiona a nivell d'agent/batalla.
 """
 
+import weakref
 from abc import ABC, abstractmethod
+from typing import Optional
 
 
 class Character(ABC):
@@ -25,16 +27,43 @@ class Character(ABC):
     BASE_SUPER_DAMAGE = 40
     BASE_SPEED = 10
     DEFEND_REDUCTION = 0.5  # Dany reduït al 50% si defensa
+    SUPER_COOLDOWN = 3      # Cooldown després d'usar super_attack
 
     def __init__(self, name: str):
         self.name = name
         self._max_health = self.BASE_HEALTH
         self.health = self._max_health
         self.is_defending = False
-        self.cooldown = 3  # Torns fins a poder usar super_attack
+        self.cooldown = self.SUPER_COOLDOWN  # Torns fins a poder usar super_attack
         self._attack_damage = self.BASE_ATTACK_DAMAGE
         self._super_damage = self.BASE_SUPER_DAMAGE
         self._speed = self.BASE_SPEED
+        # Agent propietari (referència feble) i posició a l'equip, per avisar-lo dels KO
+        self._owner: Optional[weakref.ReferenceType] = None
+        self._owner_index = 0
+
+    def __getstate__(self):
+        # deepcopy/pickle no copien l'enllaç amb el propietari (el refà l'agent copiat).
+        state = self.__dict__.copy()
+        state["_owner"] = None
+        return state
+
+    def set_owner(self, agent, index: int) -> None:
+        # Registra l'agent que té aquest personatge a team[index] (només un alhora).
+        current = self._owner() if self._owner is not None else None
+        if current is not None and current is not agent:
+            raise ValueError(f"{self.name} ja pertany a l'equip d'un altre agent")
+        self._owner = weakref.ref(agent)
+        self._owner_index = index
+
+    def _take_damage(self, damage: int) -> None:
+        # Aplica dany i marca el personatge com a KO a l'agent propietari.
+        # Única via per reduir la vida (attack, super_attack i Battle.resolve_turn).
+        self.health = max(0, self.health - damage)
+        if self.health <= 0 and self._owner is not None:
+            owner = self._owner()
+            if owner is not None:
+                owner.mark_fainted(self._owner_index)
 
     @property
     @abstractmethod
@@ -42,19 +71,28 @@ class Character(ABC):
         # Retorna el tipus de personatge com a string per a l'estat Q.
         pass
 
-    def attack(self, enemy: "Character") -> int:
+    def compute_damage(self, action: str, defending: bool) -> int:
         """
-        Atac bàsic. Fa dany reduït si l'enemic defensa.
-        Redueix cooldown en 1.
+        Dany d'un "attack" o "super_attack" segons si l'enemic defensa.
+        Única font de la fórmula de dany (també la usa src/kernel.py).
         """
-        damage = self._attack_damage
+        damage = self._super_damage if action == "super_attack" else self._attack_damage
 
-        if enemy.is_defending:
+        if defending:
             damage = int(damage * self.DEFEND_REDUCTION)
             # Arrodonir a desenes per a discretització neta
             damage = (damage // 10) * 10
 
-        enemy.health = max(0, enemy.health - damage)
+        return damage
+
+    def attack(self, enemy: "Character") -> int:
+        """
+        Atac bàsic. Fa dany reduït si l'enemic defensa.
+        Redueix cooldown en 1.
+        """
+        damage = self.compute_damage("attack", enemy.is_defending)
+
+        enemy._take_damage(damage)
         self.cooldown -= 1
         return damage
 
@@ -63,14 +101,10 @@ class Character(ABC):
         Atac especial potent. Requereix cooldown <= 0.
         Reinicia cooldown a 3 després d'usar-lo.
         """
-        damage = self._super_damage
-
-        if enemy.is_defending:
-            damage = int(damage * self.DEFEND_REDUCTION)
-            damage = (damage // 10) * 10
+        damage = self.compute_damage("super_attack", enemy.is_defending)
 
-        enemy.health = max(0, enemy.health - damage)
-        self.cooldown = 3  # Reset cooldown
+        enemy._take_damage(damage)
+        self.cooldown = self.SUPER_COOLDOWN  # Reset cooldown
         return damage
 
     def defend(self) -> bool:
@@ -90,7 +124,7 @@ class Character(ABC):
         # Reinicia el personatge completament per a un nou episodi.
         self.health = self._max_health
         self.is_defending = False
-        self.cooldown = 3
+        self.cooldown = self.SUPER_COOLDOWN
 
     def is_alive(self) -> bool:
         # Retorna True si el personatge té vida > 0.
@@ -0,0 +1,154 @@
+"""
+# Agent Dyna-Q amb prioritized sweeping.
+#
+# A més de l'actualització Q de cada torn real, l'agent aprèn un model tabular
+# de l'entorn: per a cada parell (estat, acció) acumula la recompensa observada
+# i compta els estats següents. Entre torns reals fa actualitzacions de
+# planificació amb el valor esperat segons aquest model, molt més barates que
+# un Battle.step.
+#
+# Les actualitzacions de planificació s'ordenen amb una cua de prioritat per
+# l'error TD esperat (prioritized sweeping): quan el valor d'un estat canvia,
+# els seus predecessors al model s'encuen amb la seva nova prioritat.
+#
+# L'estat de get_state és una abstracció (no inclou cooldowns ni la banqueta),
+# de manera que un model amb poques observacions és molt sorollós. Només es
+# planifica amb parells observats almenys `min_visits` vegades.
+#
+# Cada parell té com a molt una entrada vigent a la cua (només es torna a
+# encuar si la prioritat puja); les entrades substituïdes es descarten en
+# treure-les i la cua es reconstrueix quan en té més del doble de vigents,
+# de manera que la seva mida queda acotada pel nombre de parells del model.
+"""
+
+import heapq
+import itertools
+from typing import Dict, List, Optional, Set, Tuple
+
+from src.agent import QLearningAgent, ACTIONS
+
+
+class DynaQAgent(QLearningAgent):
+    """
+    QLearningAgent que planifica amb un model après (Dyna-Q + prioritized sweeping).
+    """
+
+    def __init__(self, team: List, planning_steps: int = 10, theta: float = 1e-3,
+                 min_visits: int = 5):
+        """
+        Args:
+            team: Llista d'objectes Character
+            planning_steps: Actualitzacions de planificació màximes per torn real
+            theta: Prioritat mínima (|error TD|) per encuar un parell estat-acció
+            min_visits: Observacions reals mínimes d'un parell per usar-lo a la planificació
+        """
+        super().__init__(team)
+        self.planning_steps = planning_steps
+        self.theta = theta
+        self.min_visits = min_visits
+        self.reset_model()
+
+    def reset_model(self) -> None:
+        # Descarta el model après i la cua de planificació (la Q-table es manté).
+        # model[(s, a)] = {s': comptador}; reward_sums[(s, a)] = suma de recompenses
+        self.model: Dict[Tuple[Tuple, str], Dict[Tuple, int]] = {}
+        self.model_counts: Dict[Tuple[Tuple, str], int] = {}
+        self.reward_sums: Dict[Tuple[Tuple, str], float] = {}
+        self.predecessors: Dict[Tuple, Set[Tuple[Tuple, str]]] = {}
+        self._queue: List[Tuple[float, int, Tuple[Tuple, str]]] = []
+        self._queued: Dict[Tuple[Tuple, str], float] = {}  # Prioritat de l'entrada vigent
+        self._tiebreak = itertools.count()
+        self.planning_updates = 0
+
+    def update_q(self, state: Tuple, action: str, reward: float, next_state: Tuple) -> None:
+        """
+        Actualització Q real, actualització del model i planificació.
+        """
+        old_value = self._state_value(state)
+        super().update_q(state, action, reward, next_state)
+
+        key = (state, action)
+        outcomes = self.model.setdefault(key, {})
+        outcomes[next_state] = outcomes.get(next_state, 0) + 1
+        self.model_counts[key] = self.model_counts.get(key, 0) + 1
+        self.reward_sums[key] = self.reward_sums.get(key, 0.0) + reward
+        self.predecessors.setdefault(next_state, set()).add(key)
+
+        self._push(key)
+        self._push_predecessors(state, old_value)
+        self.plan()
+
+    def _state_value(self, state: Tuple) -> float:
+        # max_a Q(s, a), amb Q = 0.0 per a les accions no vistes (com a update_q).
+        get = self.q_table.get
+        return max([get((state, a), 0.0) for a in ACTIONS])
+
+    def _push_predecessors(self, state: Tuple, old_value: float) -> None:
+        # Els objectius dels predecessors només depenen de max_a Q(state, a):
+        # si no ha canviat, no cal reencuar-los.
+        if self._state_value(state) == old_value:
+            return
+        for pred in self.predecessors.get(state, ()):
+            self._push(pred)
+
+    def _expected_target(self, key: Tuple[Tuple, str]) -> float:
+        # E[r + γ * max_a' Q(s', a')] segons el model après, amb Q = 0.0 per a
+        # les accions no vistes (com a update_q).
+        state_value = self._state_value
+        value = 0.0
+        for ns, n in self.model[key].items():
+            value += n * state_value(ns)
+        return (self.reward_sums[key] + self.gamma * value) / self.model_counts[key]
+
+    def _push(self, key: Tuple[Tuple, str]) -> None:
+        # Encua el parell si el model és prou fiable i el seu error TD esperat supera theta.
+        if self.model_counts.get(key, 0) < self.min_visits:
+            return
+        priority = abs(self._expected_target(key) - self.q_table.get(key, 0.0))
+        if priority <= self.theta:
+            return
+        # Ja encuat amb prioritat igual o més alta: la prioritat es recalcula en treure'l
+        current = self._queued.get(key)
+        if current is not None and priority <= current:
+            return
+        self._queued[key] = priority
+        heapq.heappush(self._queue, (-priority, next(self._tiebreak), key))
+        if len(self._queue) > 2 * len(self._queued):
+            self._rebuild_queue()
+
+    def _rebuild_queue(self) -> None:
+        # Reconstrueix la cua només amb les entrades vigents.
+        self._queue = [(-p, next(self._tiebreak), key) for key, p in self._queued.items()]
+        heapq.heapify(self._queue)
+
+    def plan(self, steps: Optional[int] = None) -> int:
+        """
+        Fa fins a `steps` actualitzacions de planificació (per defecte planning_steps),
+        en ordre de prioritat.
+
+        Returns:
+            Nombre d'actualitzacions fetes.
+        """
+        if steps is None:
+            steps = self.planning_steps
+        done = 0
+        while self._queue and done < steps:
+            neg_priority, _, key = heapq.heappop(self._queue)
+            # Entrada substituïda per una altra amb més prioritat
+            if self._queued.get(key) != -neg_priority:
+                continue
+            del self._queued[key]
+            old_q = self.q_table.get(key, 0.0)
+            error = self._expected_target(key) - old_q
+            # Entrada obsoleta: la prioritat ja ha baixat per sota de theta
+            if abs(error) <= self.theta:
+                continue
+            old_value = self._state_value(key[0])
+            self.q_table[key] = old_q + self.alpha * error
+            done += 1
+
+            # Prioritized sweeping: reencuar els predecessors de l'estat actualitzat
+            self._push_predecessors(key[0], old_value)
+
+        self.planning_updates += done
+        return done
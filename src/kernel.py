@@ -0,0 +1,159 @@
+"""
+# Kernel de resolució de torns precalculat.
+#
+# El dany d'un atac només depèn del tipus de l'atacant, de l'acció i de si el
+# defensor defensa; l'ordre d'execució només depèn de les accions (els switch
+# tenen prioritat) i del resultat d'iniciativa. Per tant, tot el torn es pot
+# precalcular en una taula:
+#
+#   TURN_TABLE[(tipus_A, tipus_B, acció_A, acció_B, iniciativa)] -> TurnEntry
+#
+# Cada TurnEntry dona els passos en ordre d'execució, amb el dany que fa cada
+# atac i el seu efecte sobre el cooldown. Condició de KO: el personatge
+# defensor queda KO si la seva vida és <= al dany del pas.
+#
+# Battle resol els torns amb aquesta taula; qualsevol motor per lots pot
+# fer-ho igual. check_kernel() comprova la taula contra les regles de Character.
+"""
+
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from src.agent import ACTIONS
+from src.character import CHARACTER_TYPES, Character
+
+INITIATIVE_MODES = ("probabilistic", "deterministic", "alternate", "simultaneous")
+
+# Resultats d'iniciativa
+A_FIRST = 0
+B_FIRST = 1
+SIMULTANEOUS = 2
+
+# Efecte de cada acció sobre el cooldown si s'executa: (delta, valor de reset o None)
+# (el -1 de defend s'aplica sempre a l'inici del torn, a Character.defend)
+ACTION_COOLDOWN: Dict[str, Tuple[int, Optional[int]]] = {
+    "attack": (-1, None),
+    "super_attack": (0, Character.SUPER_COOLDOWN),
+    "defend": (0, None),
+    "switch": (0, None),
+}
+
+
+class TurnStep(NamedTuple):
+    side: int                       # 0 = A, 1 = B
+    action: str
+    damage: int                     # Dany infligit si el pas s'executa
+    cooldown_delta: int             # Canvi de cooldown de l'atacant
+    cooldown_reset: Optional[int]   # Si no és None, el cooldown passa a aquest valor
+
+
+class TurnEntry(NamedTuple):
+    steps: Tuple[TurnStep, TurnStep]  # Passos en ordre d'execució
+    simultaneous: bool                # True: no es cancel·len accions per KO
+
+
+def _build_tables():
+    # Construeix les taules a partir dels stats reals de cada tipus de personatge.
+    chars = {t: cls("kernel") for t, cls in CHARACTER_TYPES.items()}
+
+    # Dany per (tipus atacant, acció, defensor defensa)
+    hit_damage = {}
+    for t, c in chars.items():
+        for action in ACTIONS:
+            for defending in (False, True):
+                if action in ("attack", "super_attack"):
+                    hit_damage[(t, action, defending)] = c.compute_damage(action, defending)
+                else:
+                    hit_damage[(t, action, defending)] = 0
+
+    # Probabilitat que A actuï primer (mode probabilistic) i qui és més ràpid (deterministic)
+    p_a_first = {}
+    faster_first = {}
+    for ta, ca in chars.items():
+        for tb, cb in chars.items():
+            sa, sb = ca.get_speed(), cb.get_speed()
+            total = sa + sb
+            p_a_first[(ta, tb)] = (sa / total) if total > 0 else 0.5
+            faster_first[(ta, tb)] = A_FIRST if sa >= sb else B_FIRST
+
+    turn_table = {}
+    for ta in chars:
+        for tb in chars:
+            for action_a in ACTIONS:
+                for action_b in ACTIONS:
+                    step_a = TurnStep(0, action_a, hit_damage[(ta, action_a, action_b == "defend")],
+                                      *ACTION_COOLDOWN[action_a])
+                    step_b = TurnStep(1, action_b, hit_damage[(tb, action_b, action_a == "defend")],
+                                      *ACTION_COOLDOWN[action_b])
+                    a_switches = action_a == "switch"
+                    b_switches = action_b == "switch"
+                    for initiative in (A_FIRST, B_FIRST, SIMULTANEOUS):
+                        if initiative == SIMULTANEOUS:
+                            entry = TurnEntry((step_a, step_b), True)
+                        # Switches sempre tenen prioritat màxima
+                        elif a_switches and not b_switches:
+                            entry = TurnEntry((step_a, step_b), False)
+                        elif b_switches and not a_switches:
+                            entry = TurnEntry((step_b, step_a), False)
+                        elif initiative == A_FIRST:
+                            entry = TurnEntry((step_a, step_b), False)
+                        else:
+                            entry = TurnEntry((step_b, step_a), False)
+                        turn_table[(ta, tb, action_a, action_b, initiative)] = entry
+
+    return hit_damage, p_a_first, faster_first, turn_table
+
+
+HIT_DAMAGE, P_A_FIRST, FASTER_FIRST, TURN_TABLE = _build_tables()
+
+
+def initiative_forced(action_a: str, action_b: str) -> bool:
+    # True si l'ordre el fixa un switch (no cal tirar iniciativa).
+    return (action_a == "switch") != (action_b == "switch")
+
+
+def _reference_hit(attacker_type: str, action: str, defending: bool) -> Tuple[int, int, int]:
+    # Executa l'acció amb els mètodes de Character: (dany, cooldown abans, cooldown després).
+    attacker = CHARACTER_TYPES[attacker_type]("check")
+    defender = CHARACTER_TYPES["tank"]("check")
+    defender.is_defending = defending
+    before = attacker.cooldown
+    if action == "attack":
+        damage = attacker.attack(defender)
+    elif action == "super_attack":
+        damage = attacker.super_attack(defender)
+    else:
+        damage = 0
+    return damage, before, attacker.cooldown
+
+
+def check_kernel() -> List[str]:
+    """
+    Comprova TURN_TABLE contra Character.attack / super_attack (dany i cooldown)
+    per a tots els tipus, parells d'accions i resultats d'iniciativa.
+
+    Returns:
+        Llista de discrepàncies (buida si la taula és correcta).
+    """
+    errors = []
+    for (ta, tb, action_a, action_b, initiative), entry in TURN_TABLE.items():
+        types = (ta, tb)
+        actions = (action_a, action_b)
+        if sorted(step.side for step in entry.steps) != [0, 1]:
+            errors.append(f"{(ta, tb, action_a, action_b, initiative)}: passos incorrectes")
+            continue
+        for step in entry.steps:
+            side = step.side
+            action = actions[side]
+            key = (ta, tb, action_a, action_b, initiative, "AB"[side])
+            damage, before, after = _reference_hit(types[side], action, actions[1 - side] == "defend")
+            if step.cooldown_reset is None:
+                cooldown = before + step.cooldown_delta
+            else:
+                cooldown = step.cooldown_reset
+            if step.action != action:
+                errors.append(f"{key}: acció {step.action} != {action}")
+            if step.damage != damage:
+                errors.append(f"{key}: dany {step.damage} != {damage}")
+            if cooldown != after:
+                errors.append(f"{key}: cooldown {cooldown} != {after}")
+    return errors
@@ -0,0 +1,200 @@
+"""
+# Agent de cerca Monte-Carlo Tree Search (MCTS) per a combat singles.
+#
+# Simula torns amb les regles reals de Battle (Battle.resolve_turn).
+# Els moviments simultanis es tracten amb decoupled UCT: cada node guarda
+# estadístiques separades per a les accions de cada banda i cada banda tria
+# la seva acció amb UCB1 de forma independent.
+#
+# L'arbre es guarda en una taula indexada per la posició (BattleState de
+# Battle.snapshot), de manera que es reaprofita entre torns i episodis en
+# lloc de reconstruir-se a cada decisió. La posició no inclou els tipus dels
+# personatges, per això l'arbre es buida quan canvia l'oponent.
+#
+# La Q-table de l'agent (hereta de QLearningAgent) s'usa com a prior de les
+# accions pròpies i com a avaluació de les fulles al final dels rollouts.
+"""
+
+import math
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+from src.agent import QLearningAgent, ACTIONS
+from src.battle import Battle, BattleState
+
+
+class _Node:
+    """
+    Node de l'arbre de cerca amb estadístiques desacoblades per banda.
+    stats_a / stats_b: {acció: [visites, valor_acumulat]}
+    """
+
+    __slots__ = ("visits", "stats_a", "stats_b")
+
+    def __init__(self, actions_a: List[str], actions_b: List[str]):
+        self.visits = 0
+        self.stats_a: Dict[str, List[float]] = {a: [0, 0.0] for a in actions_a}
+        self.stats_b: Dict[str, List[float]] = {a: [0, 0.0] for a in actions_b}
+
+
+class MCTSAgent(QLearningAgent):
+    """
+    Agent que tria cada acció amb MCTS (decoupled UCT) dins d'un pressupost
+    de temps o d'iteracions per decisió.
+    """
+
+    def __init__(self, team: List, time_budget: Optional[float] = 0.05,
+                 iterations: Optional[int] = None, exploration: float = 100.0,
+                 horizon: int = 20, prior_visits: int = 1,
+                 initiative_mode: str = "probabilistic", max_nodes: int = 200000):
+        """
+        Args:
+            team: Llista d'objectes Character
+            time_budget: Segons màxims per decisió (None = sense límit de temps)
+            iterations: Iteracions màximes per decisió (None = sense límit d'iteracions)
+            exploration: Constant d'exploració UCB1 (en unitats de recompensa)
+            horizon: Torns màxims simulats per iteració (arbre + rollout)
+            prior_visits: Visites virtuals inicials per a les accions amb valor a la Q-table
+            initiative_mode: Mode d'iniciativa de les simulacions (com a Battle)
+            max_nodes: Mida màxima de l'arbre abans de buidar-lo
+        """
+        super().__init__(team)
+        if time_budget is None and iterations is None:
+            raise ValueError("Cal indicar time_budget o iterations")
+
+        self.time_budget = time_budget
+        self.iterations = iterations
+        self.exploration = exploration
+        self.horizon = horizon
+        self.prior_visits = prior_visits
+        self.initiative_mode = initiative_mode
+        self.max_nodes = max_nodes
+
+        self._tree: Dict[BattleState, _Node] = {}
+        self._sim: Optional[Battle] = None
+        self.last_iterations = 0  # Iteracions fetes en l'última decisió
+
+    def reset_tree(self) -> None:
+        # Descarta tot l'arbre de cerca.
+        self._tree = {}
+
+    def choose_action(self, enemy_agent: "QLearningAgent") -> str:
+        """
+        Executa MCTS des de la posició actual i retorna l'acció pròpia més visitada.
+        """
+        sim = self._sim
+        if sim is None or sim.agent_b is not enemy_agent:
+            # Les estadístiques d'un altre enfrontament no valen per a aquest
+            sim = self._sim = Battle(self, enemy_agent, initiative_mode=self.initiative_mode)
+            self.reset_tree()
+
+        if len(self._tree) > self.max_nodes:
+            self._tree = {}
+
+        root_key = sim.snapshot()
+        root = self._tree.get(root_key)
+        if root is None:
+            root = self._new_node(enemy_agent)
+            self._tree[root_key] = root
+
+        deadline = None if self.time_budget is None else time.perf_counter() + self.time_budget
+        done = 0
+        while True:
+            if self.iterations is not None and done >= self.iterations:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            self._iterate(sim, root, enemy_agent)
+            sim.restore(root_key)
+            done += 1
+        self.last_iterations = done
+
+        # Acció més visitada (empat: millor valor mitjà)
+        return max(
+            root.stats_a,
+            key=lambda a: (root.stats_a[a][0], root.stats_a[a][1] / max(1, root.stats_a[a][0]))
+        )
+
+    def _new_node(self, enemy_agent: "QLearningAgent") -> _Node:
+        # Crea un node per a la posició actual, amb prior de la Q-table per a les accions pròpies.
+        node = _Node(self.get_allowed_actions(), enemy_agent.get_allowed_actions())
+        if self.prior_visits > 0 and self.q_table:
+            state = self.get_state(enemy_agent)
+            for action, stats in node.stats_a.items():
+                q = self.q_table.get((state, action))
+                if q is not None:
+                    stats[0] = self.prior_visits
+                    stats[1] = self.prior_visits * q
+        return node
+
+    def _select(self, stats: Dict[str, List[float]], visits: int, sign: float) -> str:
+        # UCB1 sobre les accions d'una banda (sign = -1 per a l'oponent, joc de suma zero).
+        untried = [a for a, (n, _) in stats.items() if n == 0]
+        if untried:
+            return random.choice(untried)
+        log_n = math.log(max(1, visits))
+        c = self.exploration
+        return max(
+            stats,
+            key=lambda a: sign * stats[a][1] / stats[a][0] + c * math.sqrt(log_n / stats[a][0])
+        )
+
+    def _iterate(self, sim: Battle, root: _Node, enemy_agent: "QLearningAgent") -> None:
+        # Una iteració de MCTS: selecció, expansió, rollout i retropropagació.
+        path: List[Tuple[_Node, str, str]] = []
+        rewards: List[float] = []
+        node = root
+        finished = False
+        expanded = False
+
+        while not finished and not expanded and len(path) < self.horizon:
+            action_a = self._select(node.stats_a, node.visits, 1.0)
+            action_b = self._select(node.stats_b, node.visits, -1.0)
+            path.append((node, action_a, action_b))
+
+            _, reward, _, finished = sim.resolve_turn(action_a, action_b)
+            rewards.append(reward)
+            if finished:
+                break
+
+            key = sim.snapshot()
+            child = self._tree.get(key)
+            if child is None:
+                child = self._new_node(enemy_agent)
+                self._tree[key] = child
+                expanded = True
+            node = child
+
+        value = 0.0 if finished else self._rollout(sim, enemy_agent, self.horizon - len(path))
+
+        # Retropropagació del retorn descomptat
+        for (n, action_a, action_b), reward in zip(reversed(path), reversed(rewards)):
+            value = reward + self.gamma * value
+            n.visits += 1
+            stats = n.stats_a[action_a]
+            stats[0] += 1
+            stats[1] += value
+            stats = n.stats_b[action_b]
+            stats[0] += 1
+            stats[1] += value
+
+    def _rollout(self, sim: Battle, enemy_agent: "QLearningAgent", depth: int) -> float:
+        # Simula torns amb accions aleatòries i avalua la fulla amb la Q-table.
+        rewards = []
+        finished = False
+        for _ in range(depth):
+            action_a = random.choice(self.get_allowed_actions())
+            action_b = random.choice(enemy_agent.get_allowed_actions())
+            _, reward, _, finished = sim.resolve_turn(action_a, action_b)
+            rewards.append(reward)
+            if finished:
+                break
+
+        value = 0.0
+        if not finished:
+            state = self.get_state(enemy_agent)
+            value = max(self.q_table.get((state, a), 0.0) for a in ACTIONS)
+        for reward in reversed(rewards):
+            value = reward + self.gamma * value
+        return value
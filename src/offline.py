@@ -0,0 +1,167 @@
+"""
+# Entrenament Q-Learning offline (batch) a partir de transicions gravades.
+#
+# No cal executar cap Battle: es carreguen transicions (estat, acció,
+# recompensa, estat_següent) amb el mateix format que QLearningAgent.get_state
+# i s'aplica fitted Q iteration sobre tot el conjunt de dades a cada passada.
+#
+# Les transicions s'agreguen en un model empíric (recompensa mitjana i
+# distribució d'estats següents per parell estat-acció), de manera que cada
+# passada és un recorregut lineal sobre arrays d'índexs en lloc de reproduir
+# episodis transició a transició amb update_q.
+#
+# La Q-table resultant té el mateix format que QLearningAgent.q_table.
+"""
+
+import json
+from typing import Dict, List, Sequence, Tuple
+
+from src.agent import ACTIONS
+
+
+def save_transitions(path: str, states: Sequence[Tuple], actions: Sequence[str],
+                     rewards: Sequence[float], next_states: Sequence[Tuple]) -> None:
+    """
+    Desa transicions en format JSON Lines (una transició per línia).
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        for s, a, r, ns in zip(states, actions, rewards, next_states):
+            f.write(json.dumps({"state": list(s), "action": a,
+                                "reward": r, "next_state": list(ns)}) + "\n")
+
+
+def load_transitions(path: str) -> Tuple[List[Tuple], List[str], List[float], List[Tuple]]:
+    """
+    Carrega transicions desades amb save_transitions.
+
+    Returns:
+        (states, actions, rewards, next_states) com a llistes paral·leles.
+    """
+    states, actions, rewards, next_states = [], [], [], []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            states.append(tuple(row["state"]))
+            actions.append(row["action"])
+            rewards.append(float(row["reward"]))
+            next_states.append(tuple(row["next_state"]))
+    return states, actions, rewards, next_states
+
+
+class OfflineQTrainer:
+    """
+    Fitted Q iteration tabular sobre un conjunt fix de transicions.
+
+    Q(s,a) = mitjana_i [r_i + γ * max_a' Q(s'_i, a')] per a les transicions amb (s_i, a_i) = (s, a).
+    Com a update_q, les accions no vistes a s' compten amb Q = 0.0.
+    """
+
+    def __init__(self, states: Sequence[Tuple], actions: Sequence[str],
+                 rewards: Sequence[float], next_states: Sequence[Tuple], gamma: float = 0.9):
+        """
+        Args:
+            states, actions, rewards, next_states: Arrays paral·lels de transicions
+            gamma: Factor de descompte (ha de ser < 1 per garantir convergència)
+        """
+        n = len(states)
+        if not (len(actions) == len(rewards) == len(next_states) == n):
+            raise ValueError("Els arrays de transicions han de tenir la mateixa longitud")
+        if not 0.0 <= gamma < 1.0:
+            raise ValueError("gamma ha d'estar a l'interval [0, 1)")
+
+        self.gamma = gamma
+
+        # Indexar parells (estat, acció) i estats següents
+        self.pairs: List[Tuple[Tuple, str]] = []
+        pair_index: Dict[Tuple[Tuple, str], int] = {}
+        next_index: Dict[Tuple, int] = {}
+        next_list: List[Tuple] = []
+
+        reward_sum: List[float] = []
+        counts: List[int] = []
+        successors: List[Dict[int, int]] = []
+
+        for s, a, r, ns in zip(states, actions, rewards, next_states):
+            key = (s, a)
+            p = pair_index.get(key)
+            if p is None:
+                p = len(self.pairs)
+                pair_index[key] = p
+                self.pairs.append(key)
+                reward_sum.append(0.0)
+                counts.append(0)
+                successors.append({})
+            j = next_index.get(ns)
+            if j is None:
+                j = len(next_list)
+                next_index[ns] = j
+                next_list.append(ns)
+            reward_sum[p] += r
+            counts[p] += 1
+            successors[p][j] = successors[p].get(j, 0) + 1
+
+        # Model empíric: recompensa mitjana i pesos dels estats següents
+        self._mean_reward = [rs / c for rs, c in zip(reward_sum, counts)]
+        self._successors = [
+            [(j, k / c) for j, k in succ.items()]
+            for succ, c in zip(successors, counts)
+        ]
+
+        # Per a cada estat següent: índexs dels parells coneguts i si en falta algun (Q = 0.0)
+        self._next_pairs: List[List[int]] = []
+        self._next_missing: List[bool] = []
+        for ns in next_list:
+            known = [pair_index[(ns, a)] for a in ACTIONS if (ns, a) in pair_index]
+            self._next_pairs.append(known)
+            self._next_missing.append(len(known) < len(ACTIONS))
+
+        self.q_values: List[float] = [0.0] * len(self.pairs)
+        self.iterations = 0
+
+    def sweep(self) -> float:
+        """
+        Fa una passada de fitted Q iteration sobre tot el conjunt de dades.
+
+        Returns:
+            Canvi màxim (en valor absolut) de Q en aquesta passada.
+        """
+        q = self.q_values
+        gamma = self.gamma
+
+        values = [
+            max(max((q[p] for p in known), default=0.0), 0.0) if missing
+            else max(q[p] for p in known)
+            for known, missing in zip(self._next_pairs, self._next_missing)
+        ]
+
+        new_q = [
+            r + gamma * sum(w * values[j] for j, w in succ)
+            for r, succ in zip(self._mean_reward, self._successors)
+        ]
+
+        delta = max((abs(x - y) for x, y in zip(new_q, q)), default=0.0)
+        self.q_values = new_q
+        self.iterations += 1
+        return delta
+
+    def fit(self, tol: float = 1e-4, max_iters: int = 1000) -> Dict[Tuple[Tuple, str], float]:
+        """
+        Itera fins que el canvi màxim de Q és inferior a tol (o max_iters).
+
+        Returns:
+            Q-table amb el format de QLearningAgent.q_table.
+        """
+        for _ in range(max_iters):
+            if self.sweep() < tol:
+                break
+        return self.get_q_table()
+
+    def get_q_table(self) -> Dict[Tuple[Tuple, str], float]:
+        # Retorna la Q-table actual com a diccionari {(estat, acció): valor}.
+        return dict(zip(self.pairs, self.q_values))
+
+    def apply_to(self, agent) -> None:
+        # Carrega la Q-table apresa a un QLearningAgent (sobreescriu els valors coincidents).
+        agent.q_table.update(self.get_q_table())
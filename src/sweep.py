@@ -0,0 +1,220 @@
+"""
+# Sweep d'hiperparàmetres (alpha, gamma, epsilon i schedule d'epsilon).
+#
+# - Espai de cerca en graella (grid_configs) o aleatori (random_configs).
+# - Successive halving: totes les configuracions s'entrenen amb un pressupost
+#   curt d'episodis i només la millor fracció 1/eta passa al següent pressupost.
+# - Hyperband: diversos brackets de successive halving amb diferents
+#   compromisos entre nombre de configuracions i pressupost inicial.
+# - Els trials s'executen en un pool de processos i cada resultat es desa a
+#   un fitxer JSON Lines (SweepStore), de manera que un sweep interromput es
+#   pot reprendre sense repetir els trials ja fets.
+#
+# Cada trial entrena un agent amb la configuració contra un oponent amb els
+# hiperparàmetres de main.py i mesura el winrate greedy contra un oponent aleatori.
+"""
+
+import itertools
+import json
+import math
+import os
+import random
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.agent import QLearningAgent
+from src.battle import Battle
+from src.training import build_team, train, evaluate, random_opponent
+
+# Valors per defecte dels paràmetres no especificats a l'espai de cerca
+DEFAULT_CONFIG = {
+    "alpha": 0.1,
+    "gamma": 0.95,
+    "epsilon": 0.05,
+    "epsilon_decay": 1.0,
+    "epsilon_min": 0.0,
+}
+
+DEFAULT_TEAM_A = ("offensive", "hybrid", "tank")
+DEFAULT_TEAM_B = ("tank", "offensive", "hybrid")
+
+
+def grid_configs(space: Dict[str, Sequence[float]]) -> List[Dict[str, float]]:
+    """
+    Genera totes les combinacions d'un espai en graella.
+
+    Args:
+        space: {paràmetre: llista de valors}, p. ex. {"alpha": [0.05, 0.1], "gamma": [0.9, 0.95]}
+    """
+    names = sorted(space)
+    return [
+        {**DEFAULT_CONFIG, **dict(zip(names, values))}
+        for values in itertools.product(*(space[n] for n in names))
+    ]
+
+
+def random_configs(space: Dict[str, Tuple[float, float]], n: int,
+                   seed: Optional[int] = None) -> List[Dict[str, float]]:
+    """
+    Mostreja n configuracions uniformement d'un espai continu.
+
+    Args:
+        space: {paràmetre: (mínim, màxim)}
+    """
+    rng = random.Random(seed)
+    names = sorted(space)
+    return [
+        {**DEFAULT_CONFIG, **{k: rng.uniform(*space[k]) for k in names}}
+        for _ in range(n)
+    ]
+
+
+def config_key(config: Dict[str, float]) -> str:
+    # Clau estable d'una configuració (per al store i per derivar la llavor).
+    return json.dumps(config, sort_keys=True)
+
+
+def run_trial(config: Dict[str, float], episodes: int, seed: int = 0,
+              team_a: Sequence[str] = DEFAULT_TEAM_A, team_b: Sequence[str] = DEFAULT_TEAM_B,
+              eval_episodes: int = 200, initiative_mode: str = "probabilistic") -> float:
+    """
+    Entrena un agent amb la configuració durant `episodes` episodis i retorna
+    el seu winrate greedy contra un oponent aleatori.
+    S'executa en un procés del pool, per això només rep dades serialitzables.
+    """
+    random.seed(seed ^ zlib.crc32(config_key(config).encode()) ^ episodes)
+
+    agent = QLearningAgent(build_team(team_a, "A"))
+    agent.setalpha(config["alpha"])
+    agent.setgamma(config["gamma"])
+    agent.setepsilon(config["epsilon"])
+
+    # Oponent d'entrenament amb els hiperparàmetres de main.py
+    opponent = QLearningAgent(build_team(team_b, "B"))
+    opponent.setalpha(DEFAULT_CONFIG["alpha"])
+    opponent.setgamma(DEFAULT_CONFIG["gamma"])
+    opponent.setepsilon(DEFAULT_CONFIG["epsilon"])
+
+    battle = Battle(agent, opponent, initiative_mode=initiative_mode)
+    # El schedule d'epsilon només s'aplica a l'agent avaluat: l'oponent és el mateix per a tots els trials
+    train(battle, episodes, epsilon_decay=config["epsilon_decay"],
+          epsilon_min=config["epsilon_min"], agents=(agent,))
+
+    return evaluate(agent, random_opponent(team_b), eval_episodes,
+                    initiative_mode=initiative_mode)
+
+
+class SweepStore:
+    """
+    Magatzem de resultats en disc (JSON Lines), una línia per trial.
+    Permet reprendre un sweep: els trials ja desats no es tornen a executar.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._results: Dict[Tuple[str, int], float] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    row = json.loads(line)
+                    self._results[(config_key(row["config"]), row["budget"])] = row["score"]
+
+    def get(self, config: Dict[str, float], budget: int) -> Optional[float]:
+        return self._results.get((config_key(config), budget))
+
+    def put(self, config: Dict[str, float], budget: int, score: float) -> None:
+        self._results[(config_key(config), budget)] = score
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"config": config, "budget": budget, "score": score}) + "\n")
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+
+def _run_rung(configs: List[Dict[str, float]], budget: int, store: SweepStore,
+              pool: ProcessPoolExecutor, trial_kwargs: Dict) -> List[float]:
+    # Executa (o recupera del store) tots els trials d'un graó amb el mateix pressupost.
+    futures = {}
+    for i, config in enumerate(configs):
+        if store.get(config, budget) is None:
+            futures[pool.submit(run_trial, config, budget, **trial_kwargs)] = i
+    for future in as_completed(futures):
+        store.put(configs[futures[future]], budget, future.result())
+    return [store.get(config, budget) for config in configs]
+
+
+def successive_halving(configs: List[Dict[str, float]], min_budget: int, max_budget: int,
+                       store: SweepStore, eta: int = 3, workers: Optional[int] = None,
+                       pool: Optional[ProcessPoolExecutor] = None,
+                       **trial_kwargs) -> List[Tuple[Dict[str, float], int, float]]:
+    """
+    Successive halving: entrena totes les configuracions amb min_budget episodis,
+    conserva la millor fracció 1/eta, multiplica el pressupost per eta i repeteix
+    fins a max_budget. Quan només queda una configuració, passa directament a max_budget.
+
+    Returns:
+        Llista (config, pressupost, score) de l'últim graó, ordenada per score.
+    """
+    if eta < 2:
+        raise ValueError("eta ha de ser >= 2")
+
+    own_pool = pool is None
+    if own_pool:
+        pool = ProcessPoolExecutor(max_workers=workers)
+
+    try:
+        survivors = list(configs)
+        budget = min_budget
+        while True:
+            scores = _run_rung(survivors, budget, store, pool, trial_kwargs)
+            ranked = sorted(zip(survivors, scores), key=lambda x: x[1], reverse=True)
+            if budget >= max_budget:
+                return [(c, budget, s) for c, s in ranked]
+            survivors = [c for c, _ in ranked[:max(1, len(ranked) // eta)]]
+            # L'últim supervivent sempre s'entrena amb el pressupost complet
+            budget = max_budget if len(survivors) == 1 else min(max_budget, budget * eta)
+    finally:
+        if own_pool:
+            pool.shutdown()
+
+
+def hyperband(space: Dict[str, Tuple[float, float]], min_budget: int, max_budget: int,
+              store: SweepStore, eta: int = 3, seed: int = 0, workers: Optional[int] = None,
+              **trial_kwargs) -> List[Tuple[Dict[str, float], int, float]]:
+    """
+    Hyperband sobre un espai aleatori: executa un bracket de successive halving
+    per a cada pressupost inicial possible.
+
+    Returns:
+        Millors resultats de tots els brackets, ordenats per score.
+    """
+    s_max = int(math.log(max_budget / min_budget, eta) + 1e-9)
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for s in range(s_max, -1, -1):
+            n = int(math.ceil((s_max + 1) / (s + 1) * eta ** s))
+            budget = max(min_budget, int(max_budget / eta ** s))
+            configs = random_configs(space, n, seed=seed + s)
+            results.extend(successive_halving(configs, budget, max_budget, store, eta=eta,
+                                              pool=pool, **trial_kwargs))
+    return sorted(results, key=lambda x: x[2], reverse=True)
+
+
+if __name__ == "__main__":
+    store = SweepStore("sweep_results.jsonl")
+    space = {
+        "alpha": (0.01, 0.5),
+        "gamma": (0.8, 0.99),
+        "epsilon": (0.01, 0.3),
+        "epsilon_decay": (0.995, 1.0),
+    }
+    best = hyperband(space, min_budget=100, max_budget=5000, store=store)
+    print("=" * 60)
+    print("MILLORS CONFIGURACIONS")
+    print("=" * 60)
+    for config, budget, score in best[:10]:
+        params = ", ".join(f"{k}={v:.4g}" for k, v in sorted(config.items()))
+        print(f"  {score * 100:5.1f}% ({budget} episodis): {params}")
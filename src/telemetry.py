@@ -0,0 +1,140 @@
+"""
+# Telemetria de memòria i visitació d'estats per a Q-tables.
+#
+# Cada QTableTelemetry està associada a un agent i compta les visites a cada
+# estat (a update_q). Cada `interval` actualitzacions genera un snapshot amb:
+# - Nombre d'entrades de la Q-table i bytes ocupats (mida profunda)
+# - Histograma de visites per a cada dimensió de get_state
+# - Fracció de l'espai d'estats encara no visitada
+# - Memòria traçada per tracemalloc (opcional)
+#
+# Els càlculs cars (mida profunda, histogrames) només es fan en emetre un
+# snapshot; entre snapshots el cost és un increment de comptador.
+"""
+
+import sys
+import tracemalloc
+from collections import Counter
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# Noms de les dimensions de l'estat (mateix ordre que QLearningAgent.get_state)
+STATE_DIMENSIONS = ("hp_propi", "hp_enemic", "tipus_propi", "tipus_enemic",
+                    "vius_propis", "vius_enemics")
+
+
+class TelemetrySnapshot(NamedTuple):
+    updates: int                        # Actualitzacions Q observades
+    entries: int                        # Entrades (estat, acció) a la Q-table
+    bytes_used: int                     # Mida profunda de la Q-table
+    visited_states: int                 # Estats diferents visitats
+    unvisited_fraction: float           # Fracció de l'espai d'estats sense visitar
+    histogram: Tuple[Dict[int, int], ...]  # Visites per valor, una entrada per dimensió
+    traced_current: Optional[int]       # Bytes traçats ara (tracemalloc)
+    traced_peak: Optional[int]          # Pic de bytes traçats (tracemalloc)
+
+
+def deep_size(obj) -> int:
+    """
+    Mida en bytes d'un objecte i de tot el que conté (dicts, tuples, llistes, sets).
+    Els objectes compartits (p. ex. strings d'accions) es compten una sola vegada.
+    """
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        total += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (tuple, list, set, frozenset)):
+            stack.extend(o)
+    return total
+
+
+class QTableTelemetry:
+    """
+    Recull telemetria de la Q-table d'un agent i l'emet periòdicament.
+    """
+
+    def __init__(self, agent, enemy_agent, interval: int = 1000,
+                 sink: Optional[Callable[[TelemetrySnapshot], None]] = None,
+                 track_allocations: bool = False):
+        """
+        Args:
+            agent: QLearningAgent a observar
+            enemy_agent: Oponent de l'agent (per a la mida de l'espai d'estats)
+            interval: Actualitzacions Q entre snapshots
+            sink: Funció cridada amb cada snapshot (a més de desar-lo a self.snapshots)
+            track_allocations: Activa tracemalloc per mesurar la memòria assignada
+        """
+        if interval <= 0:
+            raise ValueError("interval ha de ser > 0")
+
+        self.agent = agent
+        self.enemy_agent = enemy_agent
+        self.interval = interval
+        self.sink = sink
+        self.visits: Counter = Counter()
+        self.updates = 0
+        self.snapshots: List[TelemetrySnapshot] = []
+
+        self._started_tracemalloc = False
+        self.track_allocations = track_allocations
+        if track_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def observe(self, state: Tuple) -> None:
+        # Registra una visita a l'estat i emet un snapshot si toca.
+        self.visits[state] += 1
+        self.updates += 1
+        if self.updates % self.interval == 0:
+            self.emit()
+
+    def snapshot(self) -> TelemetrySnapshot:
+        # Calcula un snapshot de l'estat actual de la Q-table.
+        q_table = self.agent.q_table
+        dims = self.agent.state_dims(self.enemy_agent)
+
+        histogram = [Counter() for _ in dims]
+        for state, count in self.visits.items():
+            for h, value in zip(histogram, state):
+                h[value] += count
+
+        space = 1
+        for d in dims:
+            space *= d
+        visited = len(self.visits)
+
+        traced_current = traced_peak = None
+        if self.track_allocations and tracemalloc.is_tracing():
+            traced_current, traced_peak = tracemalloc.get_traced_memory()
+
+        return TelemetrySnapshot(
+            updates=self.updates,
+            entries=len(q_table),
+            bytes_used=deep_size(q_table),
+            visited_states=visited,
+            unvisited_fraction=max(0.0, 1.0 - visited / space),
+            histogram=tuple(dict(sorted(h.items())) for h in histogram),
+            traced_current=traced_current,
+            traced_peak=traced_peak,
+        )
+
+    def emit(self) -> TelemetrySnapshot:
+        # Genera un snapshot, el desa i el passa al sink.
+        snap = self.snapshot()
+        self.snapshots.append(snap)
+        if self.sink is not None:
+            self.sink(snap)
+        return snap
+
+    def close(self) -> None:
+        # Atura tracemalloc si l'ha iniciat aquesta telemetria.
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
@@ -0,0 +1,94 @@
+"""
+# Utilitats d'entrenament i avaluació per a agents Q-Learning.
+#
+# Encapsulen el bucle d'episodis de main.py perquè el puguin reutilitzar
+# altres mòduls (sweeps d'hiperparàmetres, comparatives, etc.).
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+from src.character import create_character
+from src.agent import QLearningAgent
+from src.battle import Battle
+
+
+def build_team(char_types: Sequence[str], suffix: str) -> List:
+    """
+    Crea un equip a partir d'una llista de tipus ("tank", "hybrid", "offensive").
+    Els noms segueixen el format de main.py (p. ex. "Tank_A").
+    """
+    return [create_character(t, f"{t.capitalize()}_{suffix}") for t in char_types]
+
+
+def run_episode(battle: Battle, max_turns: int = 100) -> str:
+    # Executa un episodi complet i retorna el guanyador ("A", "B" o "draw").
+    battle.reset_episode()
+    turn = 0
+    while battle.step() and turn < max_turns:
+        turn += 1
+    battle.end_episode()
+    return battle.get_winner()
+
+
+def train(battle: Battle, episodes: int, max_turns: int = 100,
+          epsilon_decay: float = 1.0, epsilon_min: float = 0.0,
+          agents: Optional[Sequence[QLearningAgent]] = None) -> Tuple[int, int, int]:
+    """
+    Entrena tots dos agents de la batalla durant un nombre d'episodis.
+
+    Args:
+        epsilon_decay: Factor multiplicatiu aplicat a epsilon després de cada episodi
+        epsilon_min: Valor mínim d'epsilon
+        agents: Agents als quals s'aplica el decay (per defecte, tots dos)
+
+    Returns:
+        (victòries_A, victòries_B, empats)
+    """
+    wins_a = wins_b = draws = 0
+    if agents is None:
+        agents = (battle.agent_a, battle.agent_b)
+    for _ in range(episodes):
+        winner = run_episode(battle, max_turns)
+        if winner == "A":
+            wins_a += 1
+        elif winner == "B":
+            wins_b += 1
+        else:
+            draws += 1
+        if epsilon_decay != 1.0:
+            for agent in agents:
+                agent.setepsilon(max(epsilon_min, agent.epsilon * epsilon_decay))
+    return wins_a, wins_b, draws
+
+
+def evaluate(agent: QLearningAgent, opponent: QLearningAgent, episodes: int,
+             max_turns: int = 100, initiative_mode: str = "probabilistic") -> float:
+    """
+    Avalua la política greedy de l'agent contra un oponent, sense aprendre.
+
+    Returns:
+        Winrate de l'agent (0.0 - 1.0).
+    """
+    saved = [(x, x.alpha, x.epsilon) for x in (agent, opponent)]
+    agent.setalpha(0.0)
+    agent.setepsilon(0.0)
+    opponent.setalpha(0.0)
+
+    battle = Battle(agent, opponent, initiative_mode=initiative_mode)
+    wins = 0
+    try:
+        for _ in range(episodes):
+            if run_episode(battle, max_turns) == "A":
+                wins += 1
+    finally:
+        for x, alpha, epsilon in saved:
+            x.setalpha(alpha)
+            x.setepsilon(epsilon)
+    return wins / episodes if episodes > 0 else 0.0
+
+
+def random_opponent(char_types: Sequence[str], suffix: str = "R") -> QLearningAgent:
+    # Oponent de referència que tria sempre accions aleatòries (epsilon = 1).
+    opponent = QLearningAgent(build_team(char_types, suffix))
+    opponent.setepsilon(1.0)
+    return opponent
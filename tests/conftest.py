@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Permet importar `src` i `main` des de l'arrel del repositori
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
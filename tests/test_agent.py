@@ -0,0 +1,90 @@
+import copy
+
+import pytest
+
+from src.agent import QLearningAgent
+from src.character import HybridCharacter, OffensiveCharacter, TankCharacter
+
+
+def test_direct_attacks_keep_alive_mask_in_sync():
+    attacker = QLearningAgent([OffensiveCharacter("Offensive_A")])
+    defender = QLearningAgent([HybridCharacter("Hybrid_B")])
+
+    for _ in range(5):
+        attacker.character.attack(defender.character)
+
+    assert defender.character.get_health() == 0
+    assert not defender.character.is_alive()
+    assert defender.all_fainted()
+    assert defender.count_alive() == 0
+    assert defender.get_alive_team() == []
+
+
+def test_super_attack_marks_fainted_and_forces_switch():
+    attacker = QLearningAgent([OffensiveCharacter("Offensive_A")])
+    defender = QLearningAgent([OffensiveCharacter("Offensive_B"), TankCharacter("Tank_B")])
+
+    attacker.character.super_attack(defender.character)
+    attacker.character.super_attack(defender.character)
+
+    assert defender.count_alive() == 1
+    assert defender.force_switch_if_fainted()
+    assert defender.active_index == 1
+
+
+def test_direct_health_edit_needs_refresh_alive():
+    agent = QLearningAgent([TankCharacter("Tank_A"), HybridCharacter("Hybrid_A")])
+    agent.team[1].health = 0
+    assert agent.count_alive() == 2  # La màscara no veu edicions directes
+
+    agent.refresh_alive()
+    assert agent.count_alive() == 1
+    assert agent.get_bench() == []
+    assert not agent.all_fainted()
+
+
+def test_large_team_bench_queries():
+    team = [TankCharacter(f"Tank_{i}") for i in range(6)]
+    agent = QLearningAgent(team)
+    assert agent.count_alive() == 6
+    assert [i for i, _ in agent.get_bench()] == [1, 2, 3, 4, 5]
+    assert agent.state_dims(agent)[4:] == (7, 7)
+
+
+def test_state_dims_with_uneven_teams():
+    big = QLearningAgent([TankCharacter(f"Tank_{i}") for i in range(5)])
+    small = QLearningAgent([HybridCharacter("Hybrid_B")])
+    assert big.state_dims(small)[4:] == (6, 2)
+    assert small.state_dims(big)[4:] == (2, 6)
+
+    big.enable_telemetry(small, interval=1)
+    big.update_q(big.get_state(small), "attack", 0.0, big.get_state(small))
+    snap = big.telemetry.snapshots[-1]
+    assert snap.unvisited_fraction == 1.0 - 1 / (11 * 11 * 3 * 3 * 6 * 2)
+    big.disable_telemetry()
+
+
+def test_character_copies_do_not_carry_the_owner():
+    agent = QLearningAgent([TankCharacter("Tank_A"), HybridCharacter("Hybrid_A")])
+    agent.q_table[("s", "attack")] = 1.0
+
+    clone = copy.deepcopy(agent.team[0])
+    assert clone._owner is None
+    clone.health = 10
+    clone._take_damage(10)
+    assert agent.count_alive() == 2
+
+    # Una còpia de l'agent rep els avisos del seu propi equip
+    agent_copy = copy.deepcopy(agent)
+    OffensiveCharacter("Offensive_B").super_attack(agent_copy.team[1])
+    OffensiveCharacter("Offensive_B").super_attack(agent_copy.team[1])
+    assert agent_copy.count_alive() == 1
+    assert agent.count_alive() == 2
+
+
+def test_team_cannot_be_shared_between_agents():
+    team = [TankCharacter("Tank_A")]
+    agent = QLearningAgent(team)
+    with pytest.raises(ValueError):
+        QLearningAgent(team)
+    assert team[0]._owner() is agent
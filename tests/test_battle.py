@@ -0,0 +1,102 @@
+import random
+
+from src.agent import QLearningAgent
+from src.battle import Battle
+from src.character import HybridCharacter, OffensiveCharacter, TankCharacter
+from src.training import run_episode
+
+
+def _battle(initiative_mode: str = "probabilistic") -> Battle:
+    agent_a = QLearningAgent([OffensiveCharacter("Offensive_A"), HybridCharacter("Hybrid_A"),
+                              TankCharacter("Tank_A")])
+    agent_b = QLearningAgent([TankCharacter("Tank_B"), OffensiveCharacter("Offensive_B"),
+                              HybridCharacter("Hybrid_B")])
+    return Battle(agent_a, agent_b, initiative_mode=initiative_mode)
+
+
+def test_episode_end_emitted_for_finished_episodes():
+    random.seed(0)
+    battle = _battle()
+    ends = []
+    battle.subscribe("episode_end", lambda b, winner: ends.append(winner))
+    for _ in range(5):
+        run_episode(battle)
+    assert len(ends) == 5
+
+
+def test_episode_end_emitted_for_capped_episodes():
+    random.seed(0)
+    battle = _battle()
+    ends = []
+    battle.subscribe("episode_end", lambda b, winner: ends.append(winner))
+
+    assert run_episode(battle, max_turns=0) == "draw"
+    assert ends == ["draw"]
+
+    # Tallat manualment: l'emet reset_episode en començar el següent
+    battle.step()
+    battle.reset_episode()
+    assert ends == ["draw", "draw"]
+
+    # Sense torns jugats no hi ha episodi a tancar
+    battle.reset_episode()
+    battle.end_episode()
+    assert len(ends) == 2
+
+
+def test_unsubscribe_disables_dispatch():
+    battle = _battle()
+    calls = []
+
+    def hook(b, turn_index):
+        calls.append(turn_index)
+
+    battle.subscribe("turn_start", hook)
+    battle.unsubscribe("turn_start", hook)
+    battle.reset_episode()
+    battle.step()
+    assert calls == []
+    assert not battle._hooks_active
+
+
+def test_ko_emitted_once_per_fainted_character():
+    random.seed(3)
+    battle = _battle("simultaneous")
+    kos = []
+    battle.subscribe("ko", lambda b, side, character: kos.append((side, character.name)))
+    for _ in range(20):
+        run_episode(battle)
+        for side, agent in (("A", battle.agent_a), ("B", battle.agent_b)):
+            fainted = [c.name for c in agent.team if not c.is_alive()]
+            assert sorted(n for s, n in kos if s == side) == sorted(fainted)
+            assert agent.count_alive() == len(agent.team) - len(fainted)
+        kos.clear()
+
+
+def _team_state(agent):
+    return ([(c.health, c.cooldown, c.is_defending) for c in agent.team],
+            agent.active_index, agent.alive_mask, agent.alive_count)
+
+
+def test_snapshot_restore_round_trip():
+    random.seed(1)
+    battle = _battle()
+    battle.reset_episode()
+    for _ in range(3):
+        assert battle.step()
+    # Flag de defensa no trivial (reset_turn el neteja al final de cada torn)
+    battle.agent_b.character.is_defending = True
+
+    state = battle.snapshot()
+    before = [_team_state(battle.agent_a), _team_state(battle.agent_b)]
+
+    # Jugar fins a algun KO
+    alive = battle.agent_a.alive_count + battle.agent_b.alive_count
+    while battle.agent_a.alive_count + battle.agent_b.alive_count == alive:
+        assert battle.step()
+    assert [_team_state(battle.agent_a), _team_state(battle.agent_b)] != before
+
+    battle.restore(state)
+    assert [_team_state(battle.agent_a), _team_state(battle.agent_b)] == before
+    assert battle.snapshot() == state
+    assert hash(battle.snapshot()) == hash(state)
@@ -0,0 +1,24 @@
+import random
+
+from src.agent import QLearningAgent
+from src.battle import Battle
+from src.character import HybridCharacter, OffensiveCharacter, TankCharacter
+from src.dyna import DynaQAgent
+from src.training import run_episode
+
+
+def test_planning_queue_stays_bounded_by_model_size():
+    random.seed(0)
+    agent_a = DynaQAgent([OffensiveCharacter("Offensive_A"), HybridCharacter("Hybrid_A"),
+                          TankCharacter("Tank_A")], planning_steps=5, min_visits=1)
+    agent_b = QLearningAgent([TankCharacter("Tank_B"), OffensiveCharacter("Offensive_B"),
+                              HybridCharacter("Hybrid_B")])
+    battle = Battle(agent_a, agent_b)
+
+    for _ in range(300):
+        run_episode(battle)
+        pairs = len(agent_a.model)
+        assert len(agent_a._queued) <= pairs
+        assert len(agent_a._queue) <= 2 * pairs + 1
+
+    assert agent_a.planning_updates > 0
@@ -0,0 +1,53 @@
+import hashlib
+import random
+
+from src.agent import QLearningAgent
+from src.battle import Battle
+from src.character import TankCharacter, HybridCharacter, OffensiveCharacter
+from src.kernel import check_kernel
+
+# Hash dels logs de 50 episodis (llavor 7, epsilon 0.3) amb la resolució de torns
+# original (abans de la taula precalculada). Han de coincidir exactament.
+BASELINE_LOG_HASHES = {
+    "probabilistic": "26e2fdeee6e22b9a6d61b2c5108d44b7fb2bbaf428e04774d697362c430817a2",
+    "simultaneous": "896a6ca4d8cf8664604ebb11676470327c562189c9ee06c379863dcd4bf55b20",
+}
+
+
+def _seeded_log_hash(mode: str) -> str:
+    random.seed(7)
+    agent_a = QLearningAgent([OffensiveCharacter("Offensive_A"), HybridCharacter("Hybrid_A"),
+                              TankCharacter("Tank_A")])
+    agent_b = QLearningAgent([TankCharacter("Tank_B"), OffensiveCharacter("Offensive_B"),
+                              HybridCharacter("Hybrid_B")])
+    agent_a.setepsilon(0.3)
+    agent_b.setepsilon(0.3)
+    battle = Battle(agent_a, agent_b, initiative_mode=mode)
+    logs = []
+    for _ in range(50):
+        battle.reset_episode()
+        turn = 0
+        while battle.step() and turn < 100:
+            turn += 1
+        logs.extend(battle.get_actions_log())
+    return hashlib.sha256("\n".join(logs).encode()).hexdigest()
+
+
+def test_turn_table_matches_character_rules():
+    assert check_kernel() == []
+
+
+def test_seeded_logs_match_baseline():
+    for mode, expected in BASELINE_LOG_HASHES.items():
+        assert _seeded_log_hash(mode) == expected, mode
+
+
+def test_all_initiative_modes_run():
+    for mode in ("deterministic", "alternate"):
+        agent_a = QLearningAgent([OffensiveCharacter("O"), HybridCharacter("H"), TankCharacter("T")])
+        agent_b = QLearningAgent([TankCharacter("T"), OffensiveCharacter("O"), HybridCharacter("H")])
+        battle = Battle(agent_a, agent_b, initiative_mode=mode)
+        battle.reset_episode()
+        turn = 0
+        while battle.step() and turn < 100:
+            turn += 1
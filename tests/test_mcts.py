@@ -0,0 +1,30 @@
+import random
+
+from src.agent import QLearningAgent
+from src.character import HybridCharacter, OffensiveCharacter, TankCharacter
+from src.mcts import MCTSAgent
+
+
+def _team(suffix: str):
+    return [OffensiveCharacter(f"Offensive_{suffix}"), HybridCharacter(f"Hybrid_{suffix}"),
+            TankCharacter(f"Tank_{suffix}")]
+
+
+def test_tree_is_reset_when_the_opponent_changes():
+    random.seed(0)
+    agent = MCTSAgent(_team("A"), time_budget=None, iterations=50)
+    first = QLearningAgent(_team("B"))
+    second = QLearningAgent(_team("C"))
+
+    agent.choose_action(first)
+    root_key = agent._sim.snapshot()
+    assert agent._tree[root_key].visits == 50
+
+    # Mateix oponent: l'arbre es reaprofita
+    agent.choose_action(first)
+    assert agent._tree[root_key].visits == 100
+
+    # Oponent nou amb la mateixa posició: no hereta estadístiques
+    agent.choose_action(second)
+    assert agent._sim.snapshot() == root_key
+    assert agent._tree[root_key].visits == 50
@@ -0,0 +1,56 @@
+from concurrent.futures import Future
+
+from src import sweep
+from src.sweep import SweepStore, grid_configs, successive_halving
+
+
+class SerialExecutor:
+    # Executor mínim que executa cada trial en el moment de fer submit.
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+def test_successive_halving_promotes_last_survivor_and_resumes(tmp_path, monkeypatch):
+    calls = []
+
+    def stub_trial(config, budget, **kwargs):
+        calls.append((config["alpha"], budget))
+        return config["alpha"]
+
+    monkeypatch.setattr(sweep, "run_trial", stub_trial)
+    configs = grid_configs({"alpha": [0.1 * i for i in range(1, 10)]})
+    path = str(tmp_path / "sweep.jsonl")
+
+    result = successive_halving(configs, 20, 180, SweepStore(path), eta=3,
+                                pool=SerialExecutor())
+    assert [budget for _, budget, _ in result] == [180]
+    assert result[0][0]["alpha"] == configs[-1]["alpha"]
+    assert sorted({budget for _, budget in calls}) == [20, 60, 180]
+    assert len(calls) == 9 + 3 + 1
+
+    # Un store nou sobre el mateix fitxer recupera tots els trials
+    calls.clear()
+    again = successive_halving(configs, 20, 180, SweepStore(path), eta=3,
+                               pool=SerialExecutor())
+    assert calls == []
+    assert again == result
+
+
+def test_single_survivor_jumps_to_max_budget(tmp_path, monkeypatch):
+    calls = []
+
+    def stub_trial(config, budget, **kwargs):
+        calls.append(budget)
+        return config["alpha"]
+
+    monkeypatch.setattr(sweep, "run_trial", stub_trial)
+    # 5 configuracions amb eta=3: després del primer graó només en queda una
+    configs = grid_configs({"alpha": [0.1 * i for i in range(1, 6)]})
+
+    result = successive_halving(configs, 20, 180, SweepStore(str(tmp_path / "sweep.jsonl")),
+                                eta=3, pool=SerialExecutor())
+    assert [budget for _, budget, _ in result] == [180]
+    assert calls == [20] * 5 + [180]